@@ -1,5 +1,7 @@
 import pyomo.environ as pyo
-from pyomo.opt import TerminationCondition
+from solvers import solve_model, keep_snapshot
+from warm_start import start_bos
+from telemetry import timed
 
 
 def rule_bandwidth(model, bandwidth_budget):
@@ -47,27 +49,29 @@ def obj_expression(model):
     return sum(model.D_o[i]*model.P[i] for i in model.i)
 
 
-def bos_model(constant_params, range_params):
+SOLVER_OPTIONS = {'gurobi': {'NonConvex': 2, 'InfProofCuts': 0}}
+
+
+def build_bos(constant_params, tasks):
     bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
-    tasks_data_size, tasks_time_budget, tasks_computation_per_bit, tasks_epoch_number, tasks_model_size, \
-        tasks_privacy_score, tasks_offloading_state, tasks_ids = range_params
+    tasks_ids = tasks.tasks_ids
 
     model = pyo.ConcreteModel()
 
     model.i = pyo.Set(initialize=tasks_ids)
 
     # params
-    model.D = pyo.Param(model.i, initialize=tasks_data_size)
+    model.D = pyo.Param(model.i, initialize=tasks.as_dict('D'))
 
-    model.t = pyo.Param(model.i, initialize=tasks_time_budget)
+    model.t = pyo.Param(model.i, initialize=tasks.as_dict('t'))
 
-    model.Z = pyo.Param(model.i, initialize=tasks_computation_per_bit)
+    model.Z = pyo.Param(model.i, initialize=tasks.as_dict('Z'))
 
-    model.e = pyo.Param(model.i, initialize=tasks_epoch_number)
+    model.e = pyo.Param(model.i, initialize=tasks.as_dict('e'))
 
-    model.M = pyo.Param(model.i, initialize=tasks_model_size)
+    model.M = pyo.Param(model.i, initialize=tasks.as_dict('M'))
 
-    model.P = pyo.Param(model.i, initialize=tasks_privacy_score)
+    model.P = pyo.Param(model.i, initialize=tasks.as_dict('P'))
 
     #  variables
     model.F = pyo.Var(model.i, bounds=(1, cpu_cycle_frequency))  # Frequency variables
@@ -105,39 +109,24 @@ def bos_model(constant_params, range_params):
     model.Constraint10 = pyo.Constraint(model.i, rule=time_budget3)
 
     # fixed vars
-    for task_id, alpha_value in tasks_offloading_state.items():
-        if alpha_value == "no_offloading":
-            model.alpha[task_id].fixed = True
-            model.alpha[task_id].value = 0  # this value doesn't matter
+    for task_id in tasks.ids_where(tasks.no_offloading):
+        model.alpha[task_id].fixed = True
+        model.alpha[task_id].value = 0  # this value doesn't matter
 
     # objective function
     model.OBJ = pyo.Objective(expr=obj_expression(model), sense=pyo.minimize)
 
-    # model instance
-    instance = model.create_instance()
+    return model
+
+
+def bos_model(constant_params, tasks, solver_options=None, warm_start=True, telemetry=None, snapshot=None):
+    with timed(telemetry, 'build'):
+        model = build_bos(constant_params, tasks)
+    keep_snapshot(model, snapshot, telemetry)
+
+    if warm_start:
+        with timed(telemetry, 'warm_start'):
+            start_bos(model, constant_params, tasks)
 
     # call solver
-    opt = pyo.SolverFactory('gurobi')
-    opt.options['timelimit'] = 60  # set timeout
-    opt.options['NonConvex'] = 2
-    opt.options['InfProofCuts'] = 0
-
-    try:
-        results = opt.solve(instance, tee=True)
-        # instance.printQality()
-        # instance.display()
-
-        if results.solver.termination_condition == TerminationCondition.infeasible:
-            print("------- INFEASIBLE --------")
-
-            return instance, results.solver.termination_condition
-        elif results.solver.termination_condition != TerminationCondition.optimal:
-            print("non_optimal")
-
-        print(results.solver.termination_condition)
-        print(results.solver.status)
-        print("==========================================")
-        return instance, results.solver.termination_condition
-
-    except Exception as e:
-        return instance, e
+    return model, solve_model(model, solver_options, SOLVER_OPTIONS, warmstart=warm_start, telemetry=telemetry)
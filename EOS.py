@@ -1,76 +1,35 @@
-import pyomo.environ as pyo
-from pyomo.opt import TerminationCondition
+import time
+import numpy as np
+from solution import Solution
 
 
-def bandwidth_allocation(tasks_ids, total_bandwidth):
-    bandwidth = dict()
-    for id in tasks_ids:
-        bandwidth[id] = total_bandwidth / len(tasks_ids)
-    return bandwidth
+def equal_shares(budget, n):
+    return np.full(n, budget / max(n, 1))
 
 
-def backhaul_bandwidth_allocation(tasks_ids, total_backhaul_bandwidth):
-    backhaul_bandwidth = dict()
-    for id in tasks_ids:
-        backhaul_bandwidth[id] = total_backhaul_bandwidth / len(tasks_ids)
-    return backhaul_bandwidth
+def completion_time(D, e, Z, M, F, bB):
+    # the data is already at the edge, so a task trains there on its CPU share and sends the model over
+    # its backhaul share
+    return D * e * Z / F + M / bB
 
 
-def computation_allocation(tasks_ids, total_cpu_cycles):
-    cpu_cycles = dict()
-    for id in tasks_ids:
-        cpu_cycles[id] = total_cpu_cycles / len(tasks_ids)
-    return cpu_cycles
-
-
-def completion_time(ids, data_size, epochs, comp_per_bit, model_size, backhaul_band, rsc):
-    comp_time = dict()
-    for id in ids:
-        comp_time[id] = data_size[id] * epochs[id] * comp_per_bit[id] / rsc + model_size[id] / backhaul_band
-    return comp_time
-
-
-def eos(constant_params, range_params):
+def eos(constant_params, tasks, solver_options=None, telemetry=None):
+    # edge-only baseline: nothing is offloaded and the budgets are split equally, so there is nothing to solve
+    start = time.perf_counter()
     bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
-    tasks_data_size, tasks_time_budget, tasks_computation_per_bit, tasks_epoch_number, tasks_model_size, \
-        tasks_big_constant, tasks_privacy_score, tasks_offloading_state, tasks_ids = range_params
-
-    model = pyo.ConcreteModel()
-
-    model.i = pyo.Set(initialize=tasks_ids)
-
-    # params
-    model.D = pyo.Param(model.i, initialize=tasks_data_size)
-
-    model.t = pyo.Param(model.i, initialize=tasks_time_budget)
-
-    model.N_ic = pyo.Param(model.i, initialize=tasks_computation_per_bit)
-
-    model.N_ie = pyo.Param(model.i, initialize=tasks_epoch_number)
-
-    model.M = pyo.Param(model.i, initialize=tasks_model_size)
-
-    model.big_constant = pyo.Param(model.i, initialize=tasks_big_constant)
-
-    model.B = pyo.Param(model.i,
-                        initialize=bandwidth_allocation(tasks_ids, bandwidth_budget))  # Bandwidth variables
-
-    model.F = pyo.Param(model.i,
-                        initialize=computation_allocation(tasks_ids, cpu_cycle_frequency))  # Frequency variables
-
-    model.bB = pyo.Param(model.i, initialize=backhaul_bandwidth_allocation(tasks_ids,
-                                                                           backhaul_bandwidth_budget))  # Backhaul Bandwidth variables
-
-    model.alpha = pyo.Param(model.i, initialize=0)
-
-    model.t_c = pyo.Param(model.i, initialize=completion_time(tasks_ids, tasks_data_size, tasks_epoch_number,
-                                                              tasks_computation_per_bit, tasks_model_size,
-                                                              backhaul_bandwidth_budget/len(tasks_ids),
-                                                              cpu_cycle_frequency/len(tasks_ids)))
-
-    model.D_o = pyo.Var(model.i, initialize=0)
-
-    # create model instance
-    instance = model.create_instance()
-
-    return instance, 'ok'
+    n = len(tasks)
+    D, t, Z, e, M = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M'))
+
+    B = equal_shares(bandwidth_budget, n)
+    bB = equal_shares(backhaul_bandwidth_budget, n)
+    F = equal_shares(cpu_cycle_frequency, n)
+    t_c = completion_time(D, e, Z, M, F, bB)
+
+    # t_c and missed (the tasks past their time budget) ride along with the variables of the other models;
+    # cycles is the CPU work D*e*Z each task needs
+    values = {'B': B, 'bB': bB, 'F': F, 'alpha': np.zeros(n), 'D_o': np.zeros(n), 't_c': t_c, 'missed': t_c > t,
+              'cycles': D * e * Z}
+    if telemetry is not None:
+        telemetry.record_solve(backend='closed_form', status='ok', variables=0, solve_time=time.perf_counter() - start,
+                               missed=int(np.count_nonzero(values['missed'])))
+    return Solution(tasks.tasks_ids, values, 0.0), 'ok'
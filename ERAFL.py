@@ -1,7 +1,8 @@
 import pyomo.environ as pyo
-from pyomo.environ import *
-from pyomo.opt import TerminationCondition
-import gurobipy as gp
+from solvers import solve_model, keep_snapshot
+from warm_start import start_erafl
+from telemetry import timed
+from prescreen import OFFLOADING_LEVELS
 
 
 def rule_bandwidth(model, bandwidth_budget):
@@ -65,27 +66,30 @@ def obj_expression(model):
     return sum(model.D_o[i]*model.P[i] for i in model.i)
 
 
-def erafl(constant_params, range_params):
+# also tried: 'ScaleFlag': 2, 'ObjScale': -1, 'AggFill': 0, 'Method': 3
+SOLVER_OPTIONS = {'gurobi': {'NonConvex': 2, 'Presolve': 0}}
+
+
+def build_erafl(constant_params, tasks):
     bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
-    tasks_data_size, tasks_time_budget, tasks_computation_per_bit, tasks_epoch_number, tasks_model_size, \
-        tasks_privacy_score, tasks_offloading_state, tasks_ids = range_params
+    tasks_ids = tasks.tasks_ids
 
     model = pyo.ConcreteModel()
 
     model.i = pyo.Set(initialize=tasks_ids)
 
     # params
-    model.D = pyo.Param(model.i, initialize=tasks_data_size)
+    model.D = pyo.Param(model.i, initialize=tasks.as_dict('D'))
 
-    model.t = pyo.Param(model.i, initialize=tasks_time_budget)
+    model.t = pyo.Param(model.i, initialize=tasks.as_dict('t'))
 
-    model.Z = pyo.Param(model.i, initialize=tasks_computation_per_bit)
+    model.Z = pyo.Param(model.i, initialize=tasks.as_dict('Z'))
 
-    model.e = pyo.Param(model.i, initialize=tasks_epoch_number)
+    model.e = pyo.Param(model.i, initialize=tasks.as_dict('e'))
 
-    model.M = pyo.Param(model.i, initialize=tasks_model_size)
+    model.M = pyo.Param(model.i, initialize=tasks.as_dict('M'))
 
-    model.P = pyo.Param(model.i, initialize=tasks_privacy_score)
+    model.P = pyo.Param(model.i, initialize=tasks.as_dict('P'))
 
     #  variables
     model.F = pyo.Var(model.i, bounds=(0.001, cpu_cycle_frequency))  # Frequency variables
@@ -110,14 +114,13 @@ def erafl(constant_params, range_params):
     model.D_o = pyo.Var(model.i, initialize=0)
 
     # fixed vars
-    for task_id, alpha_value in tasks_offloading_state.items():
-        if alpha_value == "no_offloading":
-            model.alpha[task_id].fixed = True
-            model.b1[task_id].fixed = True
-            model.b2[task_id].fixed = True
-            model.alpha[task_id].value = 0.3  # this value doesn't matter
-            model.b1[task_id].value = 0
-            model.b2[task_id].value = 0
+    for task_id in tasks.ids_where(tasks.no_offloading):
+        model.alpha[task_id].fixed = True
+        model.b1[task_id].fixed = True
+        model.b2[task_id].fixed = True
+        model.alpha[task_id].value = 0.3  # this value doesn't matter
+        model.b1[task_id].value = 0
+        model.b2[task_id].value = 0
 
     # constraints
     model.Constraint1 = pyo.Constraint(expr=rule_bandwidth(model, bandwidth_budget))
@@ -134,35 +137,152 @@ def erafl(constant_params, range_params):
     # objective function
     model.OBJ = pyo.Objective(expr=obj_expression(model), sense=pyo.minimize)
 
-    # model instance
-    instance = model.create_instance()
+    return model
+
+
+# the conic formulation chooses alpha from OFFLOADING_LEVELS. Off the grid the cones would not be convex, so
+# the conic formulation is an approximation of ERAFL, not a reformulation: its optimum is never below the
+# bilinear one and exceeds it by the grid error, which the benchmark reports for ERAFL_conic
+
+# without bilinear equalities the model is convex apart from the binaries, so Gurobi needs no NonConvex
+CONIC_SOLVER_OPTIONS = {'gurobi': {}}
+
+
+def conic_bandwidth_auxiliary(model, i):
+    # b[i] >= 1/B[i] as a rotated second-order cone; relaxing the equality changes nothing since a larger
+    # b only tightens the time budgets
+    return model.unit ** 2 <= model.b[i] * model.B[i]
+
+
+def conic_level(model, i):
+    return sum(model.z[i, k] for k in model.k) == 1
+
+
+def conic_frequency_perspective(model, i, k):
+    # perspective of f >= 1/F on level k: the level's copies are 0 unless z[i, k] = 1, so f and F of the
+    # chosen level satisfy the reciprocal without any big-M on f
+    return model.z[i, k] ** 2 <= model.f_k[i, k] * model.F_k[i, k]
+
+
+def conic_backhaul_perspective(model, i, k):
+    return model.z[i, k] ** 2 <= model.bb_k[i, k] * model.bB_k[i, k]
+
+
+def conic_frequency_on(model, i, k):
+    return model.F_k[i, k] <= model.F[i].ub * model.z[i, k]
+
+
+def conic_backhaul_on(model, i, k):
+    return model.bB_k[i, k] <= model.bB[i].ub * model.z[i, k]
+
+
+def conic_frequency(model, i):
+    return model.F[i] == sum(model.F_k[i, k] for k in model.k)
+
+
+def conic_frequency_auxiliary(model, i):
+    return model.f[i] == sum(model.f_k[i, k] for k in model.k)
+
+
+def conic_backhaul(model, i):
+    return model.bB[i] == sum(model.bB_k[i, k] for k in model.k)
+
+
+def conic_backhaul_auxiliary(model, i):
+    return model.bb[i] == sum(model.bb_k[i, k] for k in model.k)
+
+
+def conic_time_budget1(model, i):
+    return model.D[i] * model.b[i] + model.e[i] * model.D[i] * model.Z[i] * \
+        sum((1 - model.x[k]) * model.f_k[i, k] for k in model.k) + model.M[i] * model.bb[i] <= model.t[i]
+
+
+def conic_time_budget2(model, i):
+    return model.D[i] * model.b[i] + model.D[i] * sum(model.x[k] * model.bb_k[i, k] for k in model.k) <= model.t[i]
+
+
+def conic_offloaded_data(model, i):
+    return model.D_o[i] == model.D[i] * sum(model.x[k] * model.z[i, k] for k in model.k)
+
+
+def conic_partial(model, i):
+    return model.b1[i] == sum(model.z[i, k] for k in model.k if 0 < model.x[k] < 1)
+
+
+def conic_full(model, i):
+    return model.b2[i] == sum(model.z[i, k] for k in model.k if model.x[k] == 1)
+
+
+def conic_alpha(model, i):
+    return model.alpha[i] == sum(model.x[k] * model.z[i, k] for k in model.k if 0 < model.x[k] < 1) + \
+        0.3 * (1 - model.b1[i])
+
+
+def build_erafl_conic(constant_params, tasks, levels=OFFLOADING_LEVELS):
+    # MISOCP approximation of ERAFL with alpha restricted to levels: the offloaded fraction is picked from
+    # levels by binaries z, and F, f, bB, bb are split into per-level copies tied by perspective cones, so
+    # the products (1 - alpha) * f and alpha * bb become linear sums over the copies of the chosen level
+    model = build_erafl(constant_params, tasks)
+    for constraint in ('Constraint4', 'Constraint5', 'Constraint6', 'Constraint8', 'Constraint9', 'Constraint10'):
+        model.del_component(constraint)
+
+    model.k = pyo.Set(initialize=range(len(levels)))
+
+    model.x = pyo.Param(model.k, initialize=dict(enumerate(levels)))
+
+    model.unit = pyo.Var(bounds=(1, 1), initialize=1)
+
+    model.z = pyo.Var(model.i, model.k, domain=pyo.Binary)
+
+    model.F_k = pyo.Var(model.i, model.k, domain=pyo.NonNegativeReals)
+
+    model.f_k = pyo.Var(model.i, model.k, domain=pyo.NonNegativeReals)
+
+    model.bB_k = pyo.Var(model.i, model.k, domain=pyo.NonNegativeReals)
+
+    model.bb_k = pyo.Var(model.i, model.k, domain=pyo.NonNegativeReals)
+
+    # bounded rather than fixed, so the perspective cones keep a variable on the left for Gurobi
+    for task_id in tasks.ids_where(tasks.no_offloading):
+        model.z[task_id, 0].setlb(1)
+
+    model.Constraint4 = pyo.Constraint(model.i, rule=conic_bandwidth_auxiliary)
+    model.Constraint5 = pyo.Constraint(model.i, model.k, rule=conic_backhaul_perspective)
+    model.Constraint6 = pyo.Constraint(model.i, model.k, rule=conic_frequency_perspective)
+    model.Constraint8 = pyo.Constraint(model.i, rule=conic_time_budget1)
+    model.Constraint9 = pyo.Constraint(model.i, rule=conic_time_budget2)
+    model.Constraint10 = pyo.Constraint(model.i, rule=conic_offloaded_data)
+    model.Constraint11 = pyo.Constraint(model.i, rule=conic_level)
+    model.Constraint12 = pyo.Constraint(model.i, model.k, rule=conic_frequency_on)
+    model.Constraint13 = pyo.Constraint(model.i, model.k, rule=conic_backhaul_on)
+    model.Constraint14 = pyo.Constraint(model.i, rule=conic_frequency)
+    model.Constraint15 = pyo.Constraint(model.i, rule=conic_frequency_auxiliary)
+    model.Constraint16 = pyo.Constraint(model.i, rule=conic_backhaul)
+    model.Constraint17 = pyo.Constraint(model.i, rule=conic_backhaul_auxiliary)
+    model.Constraint18 = pyo.Constraint(model.i, rule=conic_partial)
+    model.Constraint19 = pyo.Constraint(model.i, rule=conic_full)
+    model.Constraint20 = pyo.Constraint(model.i, rule=conic_alpha)
+
+    return model
+
+
+FORMULATIONS = {
+    'bilinear': (build_erafl, SOLVER_OPTIONS),
+    'conic': (build_erafl_conic, CONIC_SOLVER_OPTIONS),
+}
+
+
+def erafl(constant_params, tasks, solver_options=None, formulation='bilinear', warm_start=True, telemetry=None,
+          snapshot=None):
+    build, model_options = FORMULATIONS[formulation]
+    with timed(telemetry, 'build'):
+        model = build(constant_params, tasks)
+    keep_snapshot(model, snapshot, telemetry)
+
+    if warm_start:
+        with timed(telemetry, 'warm_start'):
+            start_erafl(model, constant_params, tasks)
 
     # call solver
-    opt = pyo.SolverFactory('gurobi')
-    opt.options['timelimit'] = 60
-    opt.options['NonConvex'] = 2
-    opt.options['Presolve'] = 0
-    # opt.options['ScaleFlag'] = 2
-    # opt.options['ObjScale'] = -1
-    # opt.options['AggFill'] = 0
-    # opt.options['Method'] = 3
-
-    try:
-        results = opt.solve(instance, tee=True)
-        # instance.display()
-
-        if results.solver.termination_condition == TerminationCondition.infeasible:
-            print("------- INFEASIBLE --------")
-            return instance, results.solver.termination_condition
-
-        elif results.solver.termination_condition != TerminationCondition.optimal:
-            print("non_optimal")
-
-        print(results.solver.termination_condition)
-        print(results.solver.status)
-        print("==========================================")
-        return instance, results.solver.termination_condition
-
-    except Exception as e:
-        return instance, e
+    return model, solve_model(model, solver_options, model_options, warmstart=warm_start, telemetry=telemetry)
 
@@ -1,5 +1,10 @@
+import time
+import numpy as np
 import pyomo.environ as pyo
 from pyomo.opt import TerminationCondition
+from solvers import solve_model, keep_snapshot
+from solution import Solution
+from telemetry import timed
 
 
 def rule_converted(model, i):
@@ -47,25 +52,27 @@ def computation_allocation(tasks_ids, total_cpu_cycles):
     return cpu_cycles
 
 
-def eras(constant_params, range_params):
+SOLVER_OPTIONS = {'gurobi': {'NonConvex': 2, 'InfProofCuts': 0}}
+
+
+def build_eras(constant_params, tasks):
     bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
-    tasks_data_size, tasks_time_budget, tasks_computation_per_bit, tasks_epoch_number, tasks_model_size, \
-        tasks_privacy_score, tasks_offloading_state, tasks_ids = range_params
+    tasks_ids = tasks.tasks_ids
 
     model = pyo.ConcreteModel()
 
     model.i = pyo.Set(initialize=tasks_ids)
 
     # params
-    model.D = pyo.Param(model.i, initialize=tasks_data_size)
+    model.D = pyo.Param(model.i, initialize=tasks.as_dict('D'))
 
-    model.t = pyo.Param(model.i, initialize=tasks_time_budget)
+    model.t = pyo.Param(model.i, initialize=tasks.as_dict('t'))
 
-    model.Z = pyo.Param(model.i, initialize=tasks_computation_per_bit)
+    model.Z = pyo.Param(model.i, initialize=tasks.as_dict('Z'))
 
-    model.e = pyo.Param(model.i, initialize=tasks_epoch_number)
+    model.e = pyo.Param(model.i, initialize=tasks.as_dict('e'))
 
-    model.M = pyo.Param(model.i, initialize=tasks_model_size)
+    model.M = pyo.Param(model.i, initialize=tasks.as_dict('M'))
 
     model.B = pyo.Param(model.i,
                         initialize=bandwidth_allocation(tasks_ids, bandwidth_budget))  # Bandwidth variables
@@ -79,7 +86,7 @@ def eras(constant_params, range_params):
     model.f = pyo.Param(model.i,
                         initialize={i: 1 / model.F[i] for i in tasks_ids})  # auxilary variable
 
-    model.P = pyo.Param(model.i, initialize=tasks_privacy_score)
+    model.P = pyo.Param(model.i, initialize=tasks.as_dict('P'))
 
     #  variables
     model.alpha = pyo.Var(model.i, initialize=0, bounds=(0, 1))
@@ -97,42 +104,54 @@ def eras(constant_params, range_params):
     model.Constraint4 = pyo.Constraint(model.i, rule=rule_offloaded_data)
 
     # fixed vars
-    for task_id, alpha_value in tasks_offloading_state.items():
-        if alpha_value == "no_offloading":
-            model.alpha[task_id].fixed = True
-            model.b1[task_id].fixed = True
-            model.b2[task_id].fixed = True
-            model.alpha[task_id].value = 0.3  # this value doesn't matter
-            model.b1[task_id].value = 0
-            model.b2[task_id].value = 0  # b1=0 and b2=0 indicates no offloading
+    for task_id in tasks.ids_where(tasks.no_offloading):
+        model.alpha[task_id].fixed = True
+        model.b1[task_id].fixed = True
+        model.b2[task_id].fixed = True
+        model.alpha[task_id].value = 0.3  # this value doesn't matter
+        model.b1[task_id].value = 0
+        model.b2[task_id].value = 0  # b1=0 and b2=0 indicates no offloading
 
     # objective function
     model.OBJ = pyo.Objective(expr=obj_expression(model), sense=pyo.minimize)
 
-    # model instance
-    instance = model.create_instance()
-
-    # call solver
-    opt = pyo.SolverFactory('gurobi')
-    opt.options['timelimit'] = 60
-    opt.options['NonConvex'] = 2
-    opt.options['InfProofCuts'] = 0
+    return model
 
-    try:
-        results = opt.solve(instance, tee=True)
-        # instance.display()
 
-        if results.solver.termination_condition == TerminationCondition.infeasible:
-            print("-----==------- INFEASIBLE --------")
-            return instance, results.solver.termination_condition
+def eras(constant_params, tasks, solver_options=None, telemetry=None, snapshot=None):
+    with timed(telemetry, 'build'):
+        model = build_eras(constant_params, tasks)
+    keep_snapshot(model, snapshot, telemetry)
 
-        elif results.solver.termination_condition != TerminationCondition.optimal:
-            print("non optimal")
+    # call solver
+    return model, solve_model(model, solver_options, SOLVER_OPTIONS, telemetry=telemetry)
 
-        print(results.solver.termination_condition)
-        print(results.solver.status)
-        print("==========================================")
-        return instance, results.solver.termination_condition
 
-    except Exception as e:
-        return instance, e
+def eras_closed_form(constant_params, tasks, solver_options=None, telemetry=None):
+    # with the shares fixed, the minimum of sum(D_o) is each task's least feasible alpha
+    start = time.perf_counter()
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    n = len(tasks)
+    D, t, Z, e, M = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M'))
+
+    B = np.full(n, bandwidth_budget / max(n, 1))
+    bB = np.full(n, backhaul_bandwidth_budget / max(n, 1))
+    F = np.full(n, cpu_cycle_frequency / max(n, 1))
+
+    # time_budget1 bounds alpha from below and time_budget2 from above
+    lower = 1 - (t - D / B - M / bB) * F / (e * D * Z)
+    upper = (t - D / B) * bB / D
+
+    alpha = np.maximum(lower, 0)
+    alpha[tasks.column('no_offloading')] = 0.3  # fixed as in eras
+    feasible = (alpha <= np.minimum(upper, 1) + 1e-9) & (alpha >= lower - 1e-9)
+
+    D_o = alpha * D
+    values = {'B': B, 'bB': bB, 'F': F, 'f': 1 / F, 'alpha': alpha, 'b1': np.zeros(n), 'b2': np.zeros(n),
+              'D_o': D_o}
+    status = TerminationCondition.optimal if feasible.all() else TerminationCondition.infeasible
+    if telemetry is not None:
+        telemetry.record_solve(backend='closed_form', status=str(status), variables=7 * n,
+                               solve_time=time.perf_counter() - start)
+    print(status)
+    return Solution(tasks.tasks_ids, values, float(D_o.sum())), status
@@ -1,2 +1,120 @@
-import pickle
-import os
\ No newline at end of file
+import os
+import numpy as np
+from results import load_result, result_paths
+from scenario_store import load_scenario, scenario_path
+from EOS import completion_time
+
+METRICS = ('privacy_cost', 'admitted_ratio', 'bandwidth_utilization', 'backhaul_utilization', 'cpu_utilization',
+           'mean_slack', 'min_slack')
+
+# the columns of a saved result the metrics read
+EVALUATED_COLUMNS = ('B', 'bB', 'F', 'D_o', 't_c')
+
+
+class RunningStats:
+    # count, mean, variance (Welford), min and max of a metric, updated one result at a time
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, value):
+        if value is None or np.isnan(value):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+def completion_times(solution, tasks, model_name=None):
+    # as saved with the result where the model computed them (EOS), else from the allocation: EOS trains at the
+    # edge on data already there, the others upload, then take the longer of the local training plus the
+    # model transfer and the offloaded data transfer
+    saved = solution.values.get('t_c')
+    if saved is not None and not np.isnan(saved).any():
+        return np.asarray(saved)
+
+    rows = np.searchsorted(tasks.ids, solution.ids)
+    D, Z, e, M = (getattr(tasks, name)[rows] for name in ('D', 'Z', 'e', 'M'))
+    B, bB, F, D_o = (np.asarray(solution[name]) for name in ('B', 'bB', 'F', 'D_o'))
+    if model_name == 'EOS':
+        return completion_time(D, e, Z, M, F, bB)
+
+    local = np.where(D - D_o > 0, e * (D - D_o) * Z / F, 0)
+    return D / B + np.maximum(local + M / bB, D_o / bB)
+
+
+def result_metrics(solution, meta, constant_params, tasks, model_name=None):
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    rows = np.searchsorted(tasks.ids, solution.ids)
+    slack = tasks.t[rows] - completion_times(solution, tasks, model_name)
+    admitted = len(solution.ids)
+
+    return {
+        'privacy_cost': float(np.sum(tasks.P[rows] * np.asarray(solution['D_o']))),
+        'admitted_ratio': admitted / len(tasks.ids),
+        'bandwidth_utilization': float(np.sum(solution['B'])) / bandwidth_budget,
+        'backhaul_utilization': float(np.sum(solution['bB'])) / backhaul_bandwidth_budget,
+        'cpu_utilization': float(np.sum(solution['F'])) / cpu_cycle_frequency,
+        'mean_slack': float(slack.mean()) if admitted else np.nan,
+        'min_slack': float(slack.min()) if admitted else np.nan,
+        'solve_time': meta['solve_time'],
+        # results saved before bounds were recorded have none
+        'gap': meta.get('gap'),
+    }
+
+
+def iter_metrics(model_path, params_path):
+    # metrics of every saved result, loading one result at a time; the scenarios are memory-mapped
+    for load_ratio in sorted(os.listdir(model_path)):
+        directory = os.path.join(model_path, load_ratio)
+        if not os.path.isdir(directory):
+            continue
+        scenarios = dict()
+        for path in result_paths(directory):
+            model_name, iteration = os.path.basename(path).rsplit('_', 1)
+            iteration = int(iteration)
+            if iteration not in scenarios:
+                constant_params, tasks, _ = load_scenario(scenario_path(params_path, load_ratio, iteration))
+                scenarios[iteration] = (constant_params, tasks)
+            solution, meta = load_result(path, EVALUATED_COLUMNS)
+            yield load_ratio, model_name, iteration, result_metrics(solution, meta, *scenarios[iteration], model_name)
+
+
+def evaluate(model_path, params_path, metrics=METRICS + ('solve_time',)):
+    # {(model_name, load_ratio): {metric: RunningStats}}
+    aggregates = dict()
+    for load_ratio, model_name, iteration, values in iter_metrics(model_path, params_path):
+        stats = aggregates.setdefault((model_name, load_ratio), {name: RunningStats() for name in metrics})
+        for name in metrics:
+            stats[name].update(values[name])
+    return aggregates
+
+
+def summary_rows(aggregates):
+    rows = []
+    for (model_name, load_ratio), stats in sorted(aggregates.items()):
+        row = {'model': model_name, 'load_ratio': load_ratio}
+        for name, running in stats.items():
+            row[name] = running.mean
+            row[f'{name}_std'] = running.std
+        rows.append(row)
+    return rows
+
+
+if __name__ == '__main__':
+    model_path = "./test_models"
+    params_path = "./test_params"
+
+    for row in summary_rows(evaluate(model_path, params_path)):
+        print(row)
@@ -0,0 +1,233 @@
+import json
+import time
+import tracemalloc
+from functools import partial
+import pyomo.environ as pyo
+from pyomo.opt import TerminationCondition
+from init_params import task_generator, generate_random_time_budget, tasks_ids_initialization
+from task_table import TaskTable
+from sweep import seed_generators
+from telemetry import Telemetry
+from ERAFL import erafl
+from ERAS import eras, eras_closed_form
+from BOS_model import bos_model
+from solvers import SOLVER_BACKENDS, solve_model
+import ERAFL
+import ERAS
+import BOS_model
+from EOS import eos
+from direct import DIRECT_MODELS
+from decomposition import erafl_decomposition
+from heuristic import erafl_heuristic
+
+BENCHMARK_SIZES = (10, 100, 1000, 10000)
+
+# the configured budgets are sized for about this many tasks; larger scenarios get proportionally larger
+# budgets so they stay about as tight
+BASE_TASKS = 10
+
+BENCHMARK_MODELS = {
+    'ERAFL': erafl,
+    'ERAFL_conic': partial(erafl, formulation='conic'),
+    'ERAFL_decomposition': erafl_decomposition,
+    'ERAFL_heuristic': erafl_heuristic,
+    'RAFS': eras,
+    'RAFS_closed_form': eras_closed_form,
+    'BOS': bos_model,
+    'EOS': eos,
+}
+# the matrix-API builds, where gurobipy is installed
+BENCHMARK_MODELS.update({f'{model_name}_direct': model for model_name, model in DIRECT_MODELS.items()})
+
+# the Pyomo builds solved on every backend of solvers.py; with its shares fixed RAFS is linear, so the local and
+# MILP backends can solve it as well as the global MINLP ones
+BACKEND_BUILDS = {
+    'ERAFL': (ERAFL.build_erafl, ERAFL.SOLVER_OPTIONS),
+    'RAFS': (ERAS.build_eras, ERAS.SOLVER_OPTIONS),
+    'BOS': (BOS_model.build_bos, BOS_model.SOLVER_OPTIONS),
+}
+
+# a case regresses when a measure grows past the baseline by more than this factor; the objective is
+# minimized, so it regresses when it grows by more than this relative amount
+REGRESSION_THRESHOLDS = {'build_time': 1.5, 'solve_time': 1.5, 'peak_memory': 1.25, 'objective': 0.01}
+
+
+def benchmark_scenario(params, n_tasks, seed, load_cycles=300):
+    seed_generators(seed)
+    data_size, model_size, epoch_number, computation_per_bit, privacy_scores = \
+        task_generator(params, params['comp_rsc'] * load_cycles, n_tasks=n_tasks)
+    time_budget = generate_random_time_budget(n_tasks, params['time_budget_l'], params['time_budget_u'])
+    tasks = TaskTable(tasks_ids_initialization(n_tasks), data_size, time_budget, computation_per_bit,
+                      epoch_number, model_size, privacy_scores)
+
+    scale = max(n_tasks / BASE_TASKS, 1)
+    return [params['bandwidth'] * scale, params['backhaul'] * scale, params['comp_rsc'] * scale], tasks
+
+
+def run_case(model_name, constant_params, tasks, solver_options=None):
+    telemetry = Telemetry(model=model_name, tasks=len(tasks))
+
+    # peak memory counts the Python allocations only, not the memory of a solver process
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        model, status = BENCHMARK_MODELS[model_name](constant_params, tasks, solver_options, telemetry=telemetry)
+    except Exception as e:
+        # the error becomes the status of the case, as in solve_model, so one case cannot end the benchmark,
+        # e.g. a direct build past the size limit of a license
+        model, status = None, e
+    finally:
+        total_time = time.perf_counter() - start
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    objective = None
+    if status in ('optimal', 'maxTimeLimit', 'locallyOptimal'):
+        objective = pyo.value(model.OBJ) if hasattr(model, 'OBJ') else model.objective
+    gaps = [solve.get('gap') for solve in telemetry.solves if solve.get('gap') is not None]
+
+    phases = telemetry.phases
+    return {
+        'model': model_name,
+        'tasks': len(tasks),
+        'build_time': phases.get('build', 0) + phases.get('warm_start', 0),
+        'solve_time': phases.get('solve', sum(solve['solve_time'] for solve in telemetry.solves)),
+        'total_time': total_time,
+        'peak_memory': peak_memory,
+        'status': str(status),
+        'objective': None if objective is None else float(objective),
+        'gap': gaps[-1] if gaps else None,
+    }
+
+
+def run_benchmark(params, sizes=BENCHMARK_SIZES, model_names=tuple(BENCHMARK_MODELS), seed=0,
+                  solver_options=None):
+    # every model sees the same scenario of a size
+    records = []
+    for n_tasks in sizes:
+        constant_params, tasks = benchmark_scenario(params, n_tasks, seed + n_tasks)
+        cases = []
+        for model_name in model_names:
+            cases.append(run_case(model_name, constant_params, tasks, {'tee': False, **(solver_options or {})}))
+        add_grid_error(cases)
+        for record in cases:
+            records.append(record)
+            print(format_table(records[-1:], header=len(records) == 1))
+    return records
+
+
+def add_grid_error(cases):
+    # the conic ERAFL restricts alpha to OFFLOADING_LEVELS; its grid error is the relative excess of its
+    # optimum over the bilinear one on the same scenario, known when both are proven optimal
+    exact = next((record for record in cases if record['model'] == 'ERAFL'), None)
+    for record in cases:
+        record['grid_error'] = None
+        if record['model'] == 'ERAFL_conic' and exact is not None and \
+                record['status'] == exact['status'] == 'optimal':
+            record['grid_error'] = (record['objective'] - exact['objective']) / max(abs(exact['objective']), 1e-10)
+
+
+def benchmark_backends(build, constant_params, tasks, backends, solver_options=None, model_options=None,
+                       output_path=None):
+    # solves the same scenario on every backend, from a fresh build each time
+    records = []
+    for backend in backends:
+        if not pyo.SolverFactory(SOLVER_BACKENDS[backend]['solver']).available(exception_flag=False):
+            records.append({'backend': backend, 'status': 'unavailable'})
+            continue
+
+        start = time.perf_counter()
+        instance = build(constant_params, tasks)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        status = solve_model(instance, {**(solver_options or {}), 'backend': backend}, model_options, tee=False)
+        solve_time = time.perf_counter() - start
+
+        objective = None
+        if status in (TerminationCondition.optimal, TerminationCondition.maxTimeLimit,
+                      TerminationCondition.locallyOptimal):
+            objective = pyo.value(instance.OBJ)
+        records.append({'backend': backend, 'status': str(status), 'objective': objective,
+                        'build_time': build_time, 'solve_time': solve_time})
+
+    if output_path is not None:
+        with open(output_path, 'a') as f:
+            for record in records:
+                f.write(json.dumps(record) + '\n')
+    return records
+
+
+def run_backends(params, model_name, n_tasks=BASE_TASKS, seed=0, backends=tuple(SOLVER_BACKENDS), solver_options=None,
+                 output_path=None):
+    constant_params, tasks = benchmark_scenario(params, n_tasks, seed + n_tasks)
+    build, model_options = BACKEND_BUILDS[model_name]
+    return benchmark_backends(build, constant_params, tasks, backends, solver_options, model_options, output_path)
+
+
+def case_key(record):
+    return f"{record['model']}:{record['tasks']}"
+
+
+def save_baseline(records, path):
+    with open(path, 'w') as f:
+        json.dump({case_key(record): record for record in records}, f, indent=1)
+
+
+def regressions(records, baseline_path, thresholds=REGRESSION_THRESHOLDS):
+    # (case, measure, baseline, current) for every measure past its threshold
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    found = []
+    for record in records:
+        reference = baseline.get(case_key(record))
+        if reference is None:
+            continue
+        for measure, threshold in thresholds.items():
+            current, previous = record[measure], reference[measure]
+            if current is None or previous is None:
+                continue
+            if measure == 'objective':
+                worse = current - previous > threshold * max(abs(previous), 1e-9)
+            else:
+                worse = current > threshold * previous
+            if worse:
+                found.append((case_key(record), measure, previous, current))
+    return found
+
+
+def format_table(records, header=True):
+    columns = ('model', 'tasks', 'build_time', 'solve_time', 'peak_memory', 'status', 'objective', 'gap',
+               'grid_error')
+    lines = [' '.join(f'{column:>16}' for column in columns)] if header else []
+    for record in records:
+        cells = []
+        for column in columns:
+            value = record[column]
+            if column == 'peak_memory':
+                value = f'{value / 2**20:.2f}MB'
+            elif isinstance(value, float):
+                value = f'{value:.4g}'
+            cells.append(f'{str(value):>16}')
+        lines.append(' '.join(cells))
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    from main import read_simulation_config
+
+    config_params = read_simulation_config("../simulation_config.txt")
+    baseline_path = "./benchmark_baseline.json"
+
+    records = run_benchmark(config_params, solver_options={'time_limit': 60})
+    try:
+        for case, measure, previous, current in regressions(records, baseline_path):
+            print(f"regression in {case}: {measure} {previous:.4g} -> {current:.4g}")
+    except FileNotFoundError:
+        save_baseline(records, baseline_path)
+        print(f"baseline saved to {baseline_path}")
+
+    for model_name in BACKEND_BUILDS:
+        for record in run_backends(config_params, model_name, solver_options={'time_limit': 60}):
+            print(f"{model_name} on {record['backend']}: {record['status']} {record.get('objective')}")
@@ -0,0 +1,223 @@
+import time
+import numpy as np
+from pyomo.opt import TerminationCondition
+from prescreen import MINIMUM_SHARE, OFFLOADING_LEVELS
+from solution import Solution
+from solvers import DEFAULT_SOLVER_OPTIONS
+from telemetry import timed
+from warm_start import erafl_start_values
+
+# with a price on each shared budget, ERAFL splits into one closed-form problem per task and level
+
+# step is halved whenever the dual bound has not improved for patience iterations
+DECOMPOSITION_OPTIONS = {'iterations': 300, 'step': 2.0, 'patience': 20, 'repair_rounds': 12,
+                         'improve_repairs': 100}
+
+
+def backhaul_cpu_cost(prices, c, d, M):
+    # K of the cheapest bB and F within a time s, which cost K/s, and where the offloaded data d sets bB
+    price_bB, price_F = prices[1], prices[2]
+    root = np.sqrt(c * price_F) + np.sqrt(M * price_bB)
+    data_bound = np.sqrt(M) * root < d * np.sqrt(price_bB)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bound_cost = price_bB * d + price_F * c * d / (d - M)
+    return np.where(data_bound, bound_cost, root ** 2), data_bound
+
+
+def priced_cost(prices, D, t, c, d, M):
+    # cost of the cheapest B, bB, F of a task, with the shares unbounded
+    K, _ = backhaul_cpu_cost(prices, c, d, M)
+    return (np.sqrt(prices[0] * D) + np.sqrt(K)) ** 2 / t
+
+
+def priced_shares(prices, D, t, c, d, M):
+    # B, bB, F of priced_cost; the prices must be positive
+    price_B, price_bB, price_F = prices
+    K, data_bound = backhaul_cpu_cost(prices, c, d, M)
+    upload = t * np.sqrt(price_B * D) / (np.sqrt(price_B * D) + np.sqrt(K))
+    left = t - upload
+    root = (np.sqrt(c * price_F) + np.sqrt(M * price_bB)) / left
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bB = np.where(data_bound, d / left, np.sqrt(M / price_bB) * root)
+        F = np.where(data_bound, c * d / (left * (d - M)), np.sqrt(c / price_F) * root)
+    return np.array([D / upload, bB, F])
+
+
+def task_problems(tasks, levels):
+    # objective, local computation and offloaded data of every task at every level, and of the relaxation
+    # the dual bound is taken from
+    D, t, Z, e, M, P = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M', 'P'))
+    no_offloading = tasks.no_offloading[tasks.active]
+    x = np.asarray(levels, dtype=float)
+    partial = np.flatnonzero((x > 0) & (x < 1))
+    low = np.concatenate([[0], partial[:-1], [len(x) - 1]])
+    high = np.concatenate([[0], partial[1:], [len(x) - 1]])
+
+    # no_offloading tasks may only take the first level
+    barred = np.zeros((len(D), len(x)), dtype=bool)
+    barred[no_offloading, 1:] = True
+    problem = {'D': D, 't': t, 'M': M, 'P': P, 'x': x,
+               'objective': np.where(barred, np.inf, np.outer(P * D, x)),
+               'local': np.outer(e * Z * D, 1 - x), 'offload': np.outer(D, x)}
+    problem['bound_objective'] = np.where(barred[:, low], np.inf, np.outer(P * D, x[low]))
+    problem['bound_local'] = np.outer(e * Z * D, 1 - x[high])
+    problem['bound_offload'] = np.outer(D, x[low])
+    return problem
+
+
+def cheapest(problem, prices, prefix=''):
+    # per task the cheapest column at the prices (per unit of each budget) and its cost
+    D, t, M = (problem[name][:, None] for name in ('D', 't', 'M'))
+    cost = problem[f'{prefix}objective'] + priced_cost(prices, D, t, problem[f'{prefix}local'],
+                                                       problem[f'{prefix}offload'], M)
+    choice = np.argmin(cost, axis=1)
+    return choice, cost[np.arange(len(choice)), choice]
+
+
+def chosen_shares(problem, prices, choice, prefix=''):
+    rows = np.arange(len(choice))
+    return priced_shares(prices, problem['D'], problem['t'], problem[f'{prefix}local'][rows, choice],
+                         problem[f'{prefix}offload'][rows, choice], problem['M'])
+
+
+def dual_step(problem, prices, budgets, floor):
+    # the dual bound at prices per whole budget and its subgradient; a free resource would get an unbounded
+    # share, so prices are raised to floor
+    unit_prices = np.maximum(prices, floor) / budgets
+    choice, cost = cheapest(problem, unit_prices, 'bound_')
+    usage = chosen_shares(problem, unit_prices, choice, 'bound_').sum(axis=1) / budgets - 1
+    return float(cost.sum() - prices.sum()), usage, unit_prices
+
+
+def repair(problem, level, prices, budgets, minimum_share, rounds):
+    # B, bB, F within the budgets for fixed levels, None when no round fits
+    rows = np.arange(len(level))
+    D, t, M = problem['D'], problem['t'], problem['M']
+    c, d = problem['local'][rows, level], problem['offload'][rows, level]
+    prices = np.maximum(prices, 1e-12 * max(prices.max(), 1e-12))
+    for _ in range(rounds):
+        shares = np.maximum(priced_shares(prices / budgets, D, t, c, d, M), minimum_share)
+        usage = shares.sum(axis=1) / budgets
+        if np.all(usage <= 1):
+            return shares
+        prices = prices * usage ** 2
+    return None
+
+
+def improve(problem, best, prices, budgets, minimum_share, rounds, repairs):
+    # walk the incumbent down one level at a time, the tasks that save the most first
+    objective, level, shares = best
+    rows = np.arange(len(level))
+    stuck = np.zeros(len(level), dtype=bool)
+    while repairs > 0:
+        movable = np.flatnonzero((level > 0) & ~stuck)
+        if len(movable) == 0:
+            break
+        saving = problem['objective'][movable, level[movable]] - problem['objective'][movable, level[movable] - 1]
+        order = movable[np.argsort(-saving, kind='stable')]
+        count = len(order)
+        while count > 0 and repairs > 0:
+            trial = level.copy()
+            trial[order[:count]] -= 1
+            repairs -= 1
+            trial_shares = repair(problem, trial, prices, budgets, minimum_share, rounds)
+            if trial_shares is not None:
+                level, shares = trial, trial_shares
+                break
+            if count == 1:
+                stuck[order[0]] = True
+            count //= 2
+    return float(problem['objective'][rows, level].sum()), level, shares
+
+
+def decomposition_solution(tasks, problem, level, shares, objective):
+    x = problem['x'][level]
+    b1, b2 = (x > 0) & (x < 1), x == 1
+    B, bB, F = shares
+    values = {'B': B, 'bB': bB, 'F': F, 'b': 1 / B, 'bb': 1 / bB, 'f': 1 / F, 'alpha': np.where(b1, x, 0.3),
+              'b1': b1.astype(float), 'b2': b2.astype(float), 'D_o': x * problem['D']}
+    return Solution(tasks.tasks_ids, values, objective)
+
+
+def erafl_decomposition(constant_params, tasks, solver_options=None, warm_start=True, telemetry=None,
+                        levels=OFFLOADING_LEVELS, decomposition_options=None):
+    # Lagrangian decomposition of ERAFL; the offloaded fraction takes the values of levels
+    settings = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}
+    options = {**DECOMPOSITION_OPTIONS, **(decomposition_options or {})}
+    mip_gap = 1e-4 if settings['mip_gap'] is None else settings['mip_gap']
+    start = time.perf_counter()
+    budgets = np.asarray(constant_params, dtype=float)
+    minimum_share = MINIMUM_SHARE['ERAFL']
+
+    with timed(telemetry, 'build'):
+        problem = task_problems(tasks, levels)
+    # no solution costs more than offloading everything
+    ceiling = float(np.sum(problem['P'] * problem['D']))
+    lower = 0.0
+    best = None
+
+    # the heuristic start sets the scale of the first prices
+    prices = np.full(3, max(ceiling, 1e-12) / 3)
+    tried = set()
+    if warm_start and len(tasks):
+        with timed(telemetry, 'warm_start'):
+            level = erafl_start_values(constant_params, tasks, levels)['level']
+            shares = repair(problem, level, prices, budgets, minimum_share, options['repair_rounds'])
+        tried.add(level.tobytes())
+        if shares is not None:
+            best = (float(problem['objective'][np.arange(len(level)), level].sum()), level, shares)
+            prices = np.full(3, max(best[0], 1e-12 * ceiling, 1e-12) / 3)
+
+    step, stall, iteration = options['step'], 0, 0
+    objective_stop = settings['objective_stop']
+    with timed(telemetry, 'solve'):
+        for iteration in range(options['iterations'] if len(tasks) else 0):
+            upper = ceiling if best is None else best[0]
+            if upper - lower <= mip_gap * max(abs(upper), 1e-10) or lower > ceiling * (1 + 1e-9) or \
+                    time.perf_counter() - start > settings['time_limit'] or \
+                    (best is not None and objective_stop is not None and upper <= objective_stop):
+                break
+
+            value, usage, unit_prices = dual_step(problem, prices, budgets, 1e-12 * max(ceiling, 1e-12))
+            if value > lower * (1 + 1e-9) + 1e-12:
+                lower, stall = value, 0
+            else:
+                stall += 1
+                if stall >= options['patience']:
+                    step, stall = step / 2, 0
+
+            # the levels the prices pick, with shares repaired to fit the budgets
+            level, _ = cheapest(problem, unit_prices)
+            if level.tobytes() not in tried:
+                tried.add(level.tobytes())
+                objective = float(problem['objective'][np.arange(len(level)), level].sum())
+                if best is None or objective < best[0]:
+                    shares = repair(problem, level, prices, budgets, minimum_share, options['repair_rounds'])
+                    if shares is not None:
+                        best = (objective, level, shares)
+
+            upper = ceiling if best is None else best[0]
+            prices = np.maximum(prices + step * (upper - value) / max(usage @ usage, 1e-12) * usage, 0)
+            if settings['tee'] and iteration % 10 == 0:
+                print(f"{iteration:5d} bound {lower:.6g} incumbent {upper if best else '-'} prices {prices}")
+
+    if best is not None:
+        with timed(telemetry, 'improve'):
+            best = improve(problem, best, prices, budgets, minimum_share, options['repair_rounds'],
+                           options['improve_repairs'])
+        objective, level, shares = best
+        gap = (objective - lower) / max(abs(objective), 1e-10)
+        status = TerminationCondition.optimal if gap <= mip_gap else TerminationCondition.locallyOptimal
+        solution = decomposition_solution(tasks, problem, level, shares, objective)
+    else:
+        # a bound above the ceiling proves that the tasks cannot all be admitted
+        gap = None
+        status = TerminationCondition.infeasible if lower > ceiling * (1 + 1e-9) else TerminationCondition.maxTimeLimit
+        n = len(tasks)
+        solution = decomposition_solution(tasks, problem, np.zeros(n, dtype=int), np.full((3, n), np.nan), None)
+
+    if telemetry is not None:
+        telemetry.record_solve(backend='decomposition', status=str(status), variables=10 * len(tasks),
+                               solve_time=time.perf_counter() - start, iterations=iteration, bound=lower, gap=gap)
+    print(status)
+    return solution, status
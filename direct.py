@@ -0,0 +1,186 @@
+import re
+from functools import lru_cache
+import numpy as np
+from pyomo.opt import TerminationCondition
+from solution import Solution, RESULT_VARS
+from solvers import native_options
+from telemetry import timed
+from warm_start import erafl_start_values, bos_start_values
+import ERAFL
+import BOS_model
+
+# the direct path builds the models with the gurobipy matrix API, one call per constraint family over
+# all tasks, instead of Pyomo rules per task; without gurobipy, or the scipy its matrix API needs, the Pyomo
+# models are the only option
+try:
+    import gurobipy as gp
+    from gurobipy import GRB
+    import scipy.sparse  # noqa: F401
+except ImportError:
+    gp = None
+
+GUROBI_STATUS = {
+    2: TerminationCondition.optimal,  # OPTIMAL
+    3: TerminationCondition.infeasible,  # INFEASIBLE
+    4: TerminationCondition.infeasible,  # INF_OR_UNBD
+    9: TerminationCondition.maxTimeLimit,  # TIME_LIMIT
+    13: TerminationCondition.locallyOptimal,  # SUBOPTIMAL
+    15: TerminationCondition.maxTimeLimit,  # USER_OBJ_LIMIT, objective_stop reached
+}
+
+
+@lru_cache(maxsize=None)
+def gurobi_env():
+    # one environment per process, which the builds share. Starting it checks the license, which took seconds
+    # of the first build, so the solves start it before timing it
+    return gp.Env()
+
+
+def task_columns(tasks):
+    return (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M', 'P'))
+
+
+def share_vars(model, constant_params, n, minimum_share, auxiliary_upper):
+    # B, bB, F with their reciprocal auxiliaries b, bb, f and the budget constraints
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    variables = dict()
+    for share, auxiliary, budget in (('B', 'b', bandwidth_budget), ('bB', 'bb', backhaul_bandwidth_budget),
+                                     ('F', 'f', cpu_cycle_frequency)):
+        variables[share] = model.addMVar(n, lb=minimum_share, ub=budget, name=share)
+        variables[auxiliary] = model.addMVar(n, lb=1 / budget, ub=auxiliary_upper, name=auxiliary)
+        model.addConstr(variables[share].sum() <= budget, name=f'{share}_budget')
+        model.addConstr(variables[auxiliary] * variables[share] == 1, name=f'{auxiliary}_auxiliary')
+    return variables
+
+
+def build_erafl_direct(constant_params, tasks):
+    D, t, Z, e, M, P = task_columns(tasks)
+    n = len(D)
+    no_offloading = tasks.no_offloading[tasks.active]
+
+    model = gp.Model('ERAFL', env=gurobi_env())
+    variables = share_vars(model, constant_params, n, 0.001, 1 / 0.001)
+    b, bb, f = variables['b'], variables['bb'], variables['f']
+
+    # no_offloading tasks have alpha, b1 and b2 fixed through their bounds, as the fixed vars of build_erafl
+    alpha = model.addMVar(n, lb=0.3, ub=np.where(no_offloading, 0.3, 0.7), name='alpha')
+    b1 = model.addMVar(n, vtype=GRB.BINARY, ub=np.where(no_offloading, 0, 1), name='b1')
+    b2 = model.addMVar(n, vtype=GRB.BINARY, ub=np.where(no_offloading, 0, 1), name='b2')
+    D_o = model.addMVar(n, lb=-GRB.INFINITY, name='D_o')
+    variables.update({'alpha': alpha, 'b1': b1, 'b2': b2, 'D_o': D_o})
+
+    model.addConstr(b1 + b2 <= 1, name='converted3')
+    model.addConstr(D * b + (e * Z * D) * f - (e * Z) * (D_o * f) + M * bb <= t, name='time_budget1')
+    model.addConstr(D * b + D_o * bb <= t, name='time_budget2')
+    model.addConstr(D_o == D * (b1 * alpha) + D * b2, name='offloaded_data')
+
+    model.setObjective(P @ D_o, GRB.MINIMIZE)
+    return model, variables
+
+
+def build_bos_direct(constant_params, tasks):
+    D, t, Z, e, M, P = task_columns(tasks)
+    n = len(D)
+    no_offloading = tasks.no_offloading[tasks.active]
+
+    model = gp.Model('BOS', env=gurobi_env())
+    variables = share_vars(model, constant_params, n, 1, 1)
+    b, bb, f = variables['b'], variables['bb'], variables['f']
+
+    alpha = model.addMVar(n, vtype=GRB.BINARY, ub=np.where(no_offloading, 0, 1), name='alpha')
+    D_o = model.addMVar(n, lb=-GRB.INFINITY, name='D_o')
+    variables.update({'alpha': alpha, 'D_o': D_o})
+
+    model.addConstr(D_o == D * alpha, name='offloaded_data')
+    model.addConstr(D * b + (e * Z * D) * f - (e * Z) * (D_o * f) + M * bb <= t, name='time_budget1')
+    model.addConstr(D * b + D_o * bb <= t, name='time_budget2')
+    model.addConstr((e * Z * D) * f - (e * Z) * (D_o * f) <= t, name='time_budget3')
+
+    model.setObjective(P @ D_o, GRB.MINIMIZE)
+    return model, variables
+
+
+def solve_direct(model, variables, tasks, solver_options, model_options, start=None, telemetry=None):
+    settings = {'tee': True, **(solver_options or {})}
+    _, options = native_options({**(solver_options or {}), 'backend': 'gurobi'}, model_options)
+    model.Params.OutputFlag = int(bool(settings['tee']))
+    for key, value in options.items():
+        model.setParam(key, value)
+
+    if start is not None:
+        for name, values in start.items():
+            if name in variables:
+                variables[name].Start = values
+
+    with timed(telemetry, 'solve'):
+        model.optimize()
+    status = GUROBI_STATUS.get(model.Status, TerminationCondition.other)
+    if telemetry is not None:
+        telemetry.record_solve(backend='gurobi_matrix', status=str(status), variables=model.NumVars,
+                               constraints=model.NumConstrs + model.NumQConstrs, nonzeros=model.NumNZs,
+                               solve_time=model.Runtime, nodes=int(model.NodeCount),
+                               gap=model.MIPGap if model.SolCount and model.IsMIP else None)
+
+    # variables without an incumbent are left NaN, which check_constraints rejects
+    n = len(tasks)
+    values = {name: variables[name].X if model.SolCount else np.full(n, np.nan)
+              for name in RESULT_VARS + ('b', 'bb', 'f') if name in variables}
+    objective = model.ObjVal if model.SolCount else None
+    model.dispose()
+
+    print(status)
+    return Solution(tasks.tasks_ids, values, objective), status
+
+
+def erafl_direct(constant_params, tasks, solver_options=None, warm_start=True, telemetry=None):
+    gurobi_env()
+    with timed(telemetry, 'build'):
+        model, variables = build_erafl_direct(constant_params, tasks)
+    start = erafl_start_values(constant_params, tasks) if warm_start else None
+    return solve_direct(model, variables, tasks, solver_options, ERAFL.SOLVER_OPTIONS, start, telemetry)
+
+
+def bos_direct(constant_params, tasks, solver_options=None, warm_start=True, telemetry=None):
+    gurobi_env()
+    with timed(telemetry, 'build'):
+        model, variables = build_bos_direct(constant_params, tasks)
+    start = bos_start_values(constant_params, tasks) if warm_start else None
+    return solve_direct(model, variables, tasks, solver_options, BOS_model.SOLVER_OPTIONS, start, telemetry)
+
+
+# per-task constraints are named after their family and subscripted by the task's row, e.g. time_budget1[3]
+TASK_ROW = re.compile(r'\[(\d+)\]$')
+
+
+def conflicting_tasks(model_name, constant_params, tasks, solver_options=None):
+    # ids of the tasks whose own constraints are in an irreducible infeasible subsystem of the direct build;
+    # computeIIS raises when the model is not infeasible. Without gurobipy or a direct build there is none
+    if gp is None or model_name not in DIRECT_BUILDS:
+        return []
+    build, model_options = DIRECT_BUILDS[model_name]
+    model, _ = build(constant_params, tasks)
+    _, options = native_options({**(solver_options or {}), 'backend': 'gurobi'}, model_options)
+    model.Params.OutputFlag = 0
+    for key, value in options.items():
+        model.setParam(key, value)
+    try:
+        model.computeIIS()
+        names = [constraint.ConstrName for constraint in model.getConstrs() if constraint.IISConstr] + \
+            [constraint.QCName for constraint in model.getQConstrs() if constraint.IISQConstr]
+    finally:
+        model.dispose()
+
+    tasks_ids = tasks.tasks_ids
+    rows = {int(match.group(1)) for match in map(TASK_ROW.search, names) if match}
+    return [tasks_ids[row] for row in sorted(rows)]
+
+
+DIRECT_BUILDS = {
+    'ERAFL': (build_erafl_direct, ERAFL.SOLVER_OPTIONS),
+    'BOS': (build_bos_direct, BOS_model.SOLVER_OPTIONS),
+}
+
+DIRECT_MODELS = {
+    'ERAFL': erafl_direct,
+    'BOS': bos_direct,
+} if gp is not None else {}
@@ -1,26 +1,81 @@
+import numpy as np
+from prescreen import MINIMUM_SHARE, task_arrays, admissible_count
+from direct import conflicting_tasks
 
 
-def drop_task(range_params, instance):
-    comp = list()
+def heaviest_task(tasks):
+    # id of the task with the highest computational need
+    return tasks.tasks_ids[int(np.argmax(tasks.load()))]
 
-    # calculate the computational need of each task
-    for i in (instance.i):
-        comp.append(instance.D[i] * instance.Z[i] * instance.e[i])
 
-    # index of task with the highest computational need
-    index = comp.index(max(comp))
-
-    # find id of the task with the highest computational need
-    task_id = range_params[-1][index]
+def remove_task(tasks, task_id):
     print(f"drop task index : {task_id}")
 
-    # remove all parameters values of the task with the highest computational need
-    for param in range_params[0:-1]:
-        param.pop(task_id)
-        # param.pop(task_index)
-        # new_params.append({i+1:v for i, v in enumerate(param.values())})
+    # clear the task in the active mask, its values stay in the columns
+    return tasks.drop([task_id])
+
+
+# drop policies: each returns the ids to drop after an infeasible solve; attempt counts the
+# consecutive infeasible solves of the current scenario, starting at 0
+
+def drop_single(tasks, instance, constant_params, attempt, model_name):
+    return [heaviest_task(tasks)]
+
+
+def drop_batch(tasks, instance, constant_params, attempt, model_name):
+    tasks_ids, (D, t, Z, e, M) = task_arrays(tasks)
+
+    # heaviest tasks go first until the rest pass the capacity bounds of the pre-screen, since no solve
+    # can succeed before that; past the bound, the batch doubles with every further infeasible solve, and
+    # model_executor bisects back within the last batch once a solve succeeds
+    order = np.argsort(D * Z * e, kind='stable')
+    count = admissible_count(constant_params, D[order], t[order], M[order], MINIMUM_SHARE[model_name],
+                             equal_share=model_name == 'RAFS')
+    batch_size = max(len(tasks_ids) - count, 2 ** attempt)
+    return tasks_ids[order[::-1][:batch_size]].tolist()
+
+
+def drop_iis(tasks, instance, constant_params, attempt, model_name):
+    # drop the heaviest task taking part in an irreducible infeasible subsystem, computed on the gurobipy
+    # build of direct.py over the same tasks
+    try:
+        conflict = conflicting_tasks(model_name, constant_params, tasks)
+    except Exception as e:
+        print(f"no infeasibility certificate: {e}")
+        conflict = []
+
+    tasks_ids = np.array(tasks.tasks_ids)
+    candidates = np.isin(tasks_ids, conflict)
+    if not candidates.any():
+        return drop_single(tasks, instance, constant_params, attempt, model_name)
+    return [int(tasks_ids[candidates][np.argmax(tasks.load()[candidates])])]
+
+
+DROP_POLICIES = {
+    'single': drop_single,
+    'batch': drop_batch,
+    'iis': drop_iis,
+}
 
-    # remove id of the task with the highest computational need
-    range_params[-1].remove(task_id)
 
-    return range_params
+def bisect_admission(tasks, solve, admitted=0):
+    # admit the lightest tasks first and binary search the longest admissible prefix; the caller has
+    # already found the full set infeasible and the lightest admitted tasks admissible. solve returns the
+    # accepted model or None
+    # the search assumes admission is monotone along that order: dropping a task only loosens the shared
+    # budgets, so this holds for proven solves, but a solve that times out without an incumbent can reject a
+    # prefix whose extension is admissible, and then a shorter prefix than the longest admissible one is kept
+    # returns the model and the tasks of the longest accepted prefix, or None when no prefix longer than
+    # admitted is accepted
+    order = np.array(tasks.tasks_ids)[np.argsort(tasks.load(), kind='stable')]
+    feasible, infeasible = admitted, len(order)
+    best = None
+    while infeasible - feasible > 1:
+        middle = (feasible + infeasible) // 2
+        candidate = tasks.keep(order[:middle])
+        model = solve(candidate)
+        if model is None:
+            infeasible = middle
+        else:
+            feasible, best = middle, (model, candidate)
+    return best
@@ -0,0 +1,123 @@
+import time
+import numpy as np
+from pyomo.opt import TerminationCondition
+from decomposition import task_problems, priced_shares
+from prescreen import MINIMUM_SHARE, OFFLOADING_LEVELS
+from solution import Solution
+
+# rounds of balancing the prices at the levels of the last greedy and choosing levels again
+PASSES = 3
+
+
+def level_shares(problem, budgets, minimum_share, prices):
+    # B, bB, F of every task at every level (3 x n x levels) that meet time_budget1 and time_budget2 at the
+    # least cost, with prices per whole budget as in decomposition
+    D, t, M = (problem[name][:, None] for name in ('D', 't', 'M'))
+    return np.maximum(priced_shares(prices / budgets, D, t, problem['local'], problem['offload'], M), minimum_share)
+
+
+def balanced_prices(problem, level, prices, budgets, minimum_share, rounds=12):
+    # prices at which the shares of the tasks at level use each budget alike, so that the greedy does not
+    # run out of one budget with the others left over: as in the repair of decomposition, a share goes about
+    # as the inverse square root of its price
+    rows = np.arange(len(level))
+    c, d = problem['local'][rows, level], problem['offload'][rows, level]
+    for _ in range(rounds):
+        shares = np.maximum(priced_shares(prices / budgets, problem['D'], problem['t'], c, d, problem['M']),
+                            minimum_share)
+        prices = prices * (shares.sum(axis=1) / budgets) ** 2
+        prices /= prices.sum()
+    return prices
+
+
+def greedy_levels(problem, shares, budgets):
+    # every task starts at the level that needs the least of the budgets; then, in order of the privacy cost
+    # (P * D) it would save per budget used, each task moves to the level of least offloaded data that still
+    # fits. None when even the starting levels do not fit
+    objective = problem['objective']
+    rows = np.arange(objective.shape[0])
+    usage = np.where(np.isfinite(objective), (shares / budgets[:, None, None]).sum(axis=0), np.inf)
+    level = np.argmin(usage, axis=1)
+    used = shares[:, rows, level].sum(axis=1)
+    if np.any(used > budgets):
+        return None
+
+    # the saving and the budget used are those of going down to no offloading, with the budgets weighted by
+    # how tight the starting levels leave them
+    weights = used / budgets
+    extra = ((shares[:, rows, 0] - shares[:, rows, level]) / budgets[:, None] * weights[:, None]).sum(axis=0)
+    density = (objective[rows, level] - objective[:, 0]) / np.maximum(extra, 1e-12)
+    for i in np.argsort(-np.nan_to_num(density, nan=-np.inf), kind='stable'):
+        free = budgets - used + shares[:, i, level[i]]
+        fits = np.flatnonzero(np.all(shares[:, i, :] <= free[:, None], axis=0) & np.isfinite(objective[i]))
+        best = fits[np.argmin(objective[i, fits])]
+        used += shares[:, i, best] - shares[:, i, level[i]]
+        level[i] = best
+    return level
+
+
+def water_fill(shares, budget):
+    # what is left of the budget raises the smallest shares to a common level h, sum(max(h - s, 0)) = left
+    left = budget - shares.sum()
+    if left <= 0 or len(shares) == 0:
+        return shares
+    ordered = np.sort(shares)
+    heights = (left + np.cumsum(ordered)) / np.arange(1, len(ordered) + 1)
+    # raising the k smallest is consistent while their common height stays above the k-th share
+    k = np.flatnonzero(heights >= ordered)[-1]
+    return np.maximum(shares, heights[k])
+
+
+def erafl_heuristic_values(constant_params, tasks, levels=OFFLOADING_LEVELS):
+    # {variable: values} of an ERAFL allocation without a solver, None when it finds none: per-task least
+    # shares at each level at balanced prices, a greedy choice of levels, water-filling of the budgets left,
+    # and at last the least alpha time_budget1 allows with the filled shares
+    budgets = np.asarray(constant_params, dtype=float)
+    problem = task_problems(tasks, levels)
+    rows = np.arange(len(tasks))
+    minimum_share = MINIMUM_SHARE['ERAFL']
+    prices, level, best = np.ones(3), np.zeros(len(tasks), dtype=int), None
+    for _ in range(PASSES):
+        prices = balanced_prices(problem, level, prices, budgets, minimum_share)
+        shares = level_shares(problem, budgets, minimum_share, prices)
+        level = greedy_levels(problem, shares, budgets)
+        if level is None:
+            break
+        objective = problem['objective'][rows, level].sum()
+        if best is None or objective < best[0]:
+            best = (objective, level, shares)
+    if best is None:
+        return None
+    _, level, shares = best
+
+    B, bB, F = (water_fill(shares[r, rows, level], budgets[r]) for r in range(3))
+
+    # the filled shares leave slack, so the offloaded fraction may go down, and never up, to what
+    # time_budget1 needs; a lower fraction only loosens time_budget2
+    D, t, Z, e, M = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M'))
+    needed = 1 - (t - D / B - M / bB) * F / (e * Z * D)
+    fraction = np.where(needed <= 0, 0, np.where(needed <= 0.7, np.maximum(needed, 0.3), 1))
+    x = np.minimum(fraction, problem['x'][level])
+
+    b1, b2 = (x > 0) & (x < 1), x == 1
+    return {'B': B, 'bB': bB, 'F': F, 'b': 1 / B, 'bb': 1 / bB, 'f': 1 / F, 'alpha': np.where(b1, x, 0.3),
+            'b1': b1.astype(float), 'b2': b2.astype(float), 'D_o': x * D}
+
+
+def erafl_heuristic(constant_params, tasks, solver_options=None, telemetry=None):
+    # a feasible allocation comes back as locallyOptimal, for model_executor to validate, and none as 'other'
+    start = time.perf_counter()
+    n = len(tasks)
+    values = erafl_heuristic_values(constant_params, tasks) if n else {}
+    if values is None:
+        status = TerminationCondition.other
+        values = {name: np.full(n, np.nan) for name in ('B', 'bB', 'F', 'alpha', 'b1', 'b2', 'D_o')}
+        objective = None
+    else:
+        status = TerminationCondition.locallyOptimal
+        objective = float(np.sum(tasks.column('P') * values['D_o'])) if n else 0.0
+    if telemetry is not None:
+        telemetry.record_solve(backend='heuristic', status=str(status), variables=10 * n,
+                               solve_time=time.perf_counter() - start)
+    print(status)
+    return Solution(tasks.tasks_ids, values, objective), status
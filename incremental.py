@@ -0,0 +1,86 @@
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables, replace_expressions
+from solvers import SOLVER_BACKENDS, native_options, stopped_status
+from warm_start import start_erafl, start_bos
+import ERAFL
+import BOS_model
+
+# models whose per-task constraints can be released on a live model; RAFS shares every resource
+# equally, so dropping one task changes the Params of all the others and it is still rebuilt
+PERSISTENT_MODELS = {
+    'ERAFL': (ERAFL.build_erafl, ERAFL.SOLVER_OPTIONS, start_erafl),
+    'BOS': (BOS_model.build_bos, BOS_model.SOLVER_OPTIONS, start_bos),
+}
+
+
+def open_persistent(model_name, constant_params, tasks, solver_options=None):
+    build, model_options, start = PERSISTENT_MODELS[model_name]
+    model = build(constant_params, tasks)
+    # the first resolve passes it as the MIP start, later ones the previous solution
+    start(model, constant_params, tasks)
+
+    opt = pyo.SolverFactory('gurobi_persistent')
+    opt.set_instance(model)
+    _, options = native_options({**(solver_options or {}), 'backend': 'gurobi'}, model_options)
+    for key, value in options.items():
+        opt.options[key] = value
+
+    return model, opt
+
+
+def resolve(model, opt, tee=True, objective_stop=None):
+    # objective_stop is set or cleared on every resolve, as the bound changes with the tasks left
+    option = SOLVER_BACKENDS['gurobi']['objective_stop']
+    if objective_stop is None:
+        opt.options.pop(option, None)
+    else:
+        opt.options[option] = objective_stop
+    try:
+        # the values left on the model by the previous solve are passed as the MIP start
+        results = opt.solve(tee=tee, warmstart=True)
+        status = results.solver.termination_condition
+        if opt.get_model_attr('SolCount') > 0:
+            status = stopped_status(status, model, objective_stop)
+
+        if status == pyo.TerminationCondition.infeasible:
+            print("------- INFEASIBLE --------")
+
+        print(status)
+        print(results.solver.status)
+        print("==========================================")
+        return model, status
+
+    except Exception as e:
+        return model, e
+
+
+def release_task(model, opt, task_id):
+    # take its terms out of the shared budgets and the objective, as fixing its variables to 0 would put them
+    # below their lower bounds and B*b == 1 out of reach
+    released = [var[task_id] for var in model.component_objects(pyo.Var)]
+    substitute = {id(var): 0 for var in released}
+    budgets = []
+    for constraint in model.component_objects(pyo.Constraint, active=True):
+        # only the scalar budgets are shared between tasks; the indexed constraints each belong to one task
+        if not constraint.is_indexed():
+            budgets.append(constraint)
+        elif task_id in constraint and constraint[task_id].active:
+            opt.remove_constraint(constraint[task_id])
+            constraint[task_id].deactivate()
+
+    for constraint in budgets:
+        if any(id(var) in substitute for var in identify_variables(constraint.body)):
+            opt.remove_constraint(constraint)
+            body = replace_expressions(constraint.body, substitute)
+            # a budget without any task left bounds nothing
+            if next(identify_variables(body), None) is None:
+                constraint.deactivate()
+                continue
+            constraint.set_value((constraint.lower, body, constraint.upper))
+            opt.add_constraint(constraint)
+    model.OBJ.set_value(replace_expressions(model.OBJ.expr, substitute))
+    opt.set_objective(model.OBJ)
+
+    # its variables are in no constraint anymore, so they leave the solver as well
+    for var in released:
+        opt.remove_var(var)
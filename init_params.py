@@ -1,29 +1,28 @@
-import random
-import os
-import pickle
 import numpy as np
+from task_table import TaskTable
+from scenario_store import save_scenario, scenario_path
+
+
+PRIVACY_SCORES = [1, 2, 4, 8, 16]
 
 
 def generate_random_time_budget(n, lower_bound, upper_bound):
-    time_budget = dict()
-    for i in range(1, n + 1):
-        time_budget[i] = random.uniform(lower_bound, upper_bound)
-    return time_budget
+    return np.random.uniform(lower_bound, upper_bound, n)
 
 
 def required_computation_initialization(model_size):
-    return int((500 / 40) * model_size)
+    return ((500 / 40) * model_size).astype(int)
 
 
-def generate_random_epoch_number(lower_bound, upper_bound):
-    return int(np.random.uniform(lower_bound, upper_bound))
+def generate_random_epoch_number(lower_bound, upper_bound, size):
+    return np.random.uniform(lower_bound, upper_bound, size).astype(int)
 
 
 def tasks_ids_initialization(number_of_tasks):
     return [i + 1 for i in range(number_of_tasks)]
 
 
-def logspace_based_random_generator(lower_boundary, upper_boundary, chunk_number):
+def logspace_boundaries(lower_boundary, upper_boundary):
 
     # lower_power = int(np.log10(lower_boundary))
     # upper_power = int(np.log10(upper_boundary))
@@ -38,83 +37,81 @@ def logspace_based_random_generator(lower_boundary, upper_boundary, chunk_number
         boundary = boundary + 2**counter
         boundaries.append(boundary)
         counter += 1
+    return np.array(boundaries)
+
 
-    chunks_representative = [np.random.uniform(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)]
-    random.shuffle(chunks_representative)
-    return random.choice(chunks_representative)
+def logspace_based_random_generator(boundaries, size):
+    # a chunk between two consecutive boundaries is picked uniformly, then a uniform value inside it
+    chunks = np.random.randint(0, len(boundaries) - 1, size)
+    return np.random.uniform(boundaries[chunks], boundaries[chunks + 1])
 
 
-def task_generator(params, load_budget):
-    required_comp_list = []
-    tasks_data_size = []
-    tasks_model_size = []
-    tasks_epoch_number = []
-    tasks_computation_per_bit = []
-    tasks_privacy_scores = []
+def task_generator(params, load_budget, block_size=1024, n_tasks=None):
+    # n_tasks asks for exactly that many tasks instead of filling load_budget, which then only caps the
+    # load of each task; the boundary tables only depend on the config, so they are built once
+    data_boundaries = logspace_boundaries(params['data_size_l'], params['data_size_u'])
+    model_boundaries = logspace_boundaries(params['model_size_l'], params['model_size_u'])
+
+    blocks = []
+    total_comp = 0
+    count = 0
     while True:
-        data_size = logspace_based_random_generator(params['data_size_l'], params['data_size_u'], 100)
+        # candidate tasks are drawn a block at a time, with columns in the returned order
+        data_size = logspace_based_random_generator(data_boundaries, block_size)
 
-        model_size = logspace_based_random_generator(params['model_size_l'], params['model_size_u'], 100)
+        model_size = logspace_based_random_generator(model_boundaries, block_size)
 
-        epoch_number = generate_random_epoch_number(params['epoch_l'], params['epoch_u'])
+        epoch_number = generate_random_epoch_number(params['epoch_l'], params['epoch_u'], block_size)
 
         computation_per_bit = required_computation_initialization(model_size)
 
-        privacy_score = random.choice([1, 2, 4, 8, 16])
+        privacy_score = np.random.choice(PRIVACY_SCORES, block_size)
 
         required_comp = data_size * epoch_number * computation_per_bit
 
         # if task load is approved then add all related parameters
-        if required_comp < load_budget:
-            tasks_data_size.append(data_size)
-            tasks_model_size.append(model_size)
-            tasks_epoch_number.append(epoch_number)
-            tasks_computation_per_bit.append(computation_per_bit)
-            required_comp_list.append(required_comp)
-            tasks_privacy_scores.append(privacy_score)
-        if sum(required_comp_list) > load_budget:
-            tasks_data_size = {key: value for key, value in enumerate(tasks_data_size, 1)}
-            tasks_model_size = {key: value for key, value in enumerate(tasks_model_size, 1)}
-            tasks_epoch_number = {key: value for key, value in enumerate(tasks_epoch_number, 1)}
-            tasks_computation_per_bit = {key: value for key, value in enumerate(tasks_computation_per_bit, 1)}
-            tasks_privacy_scores = {key: value for key, value in enumerate(tasks_privacy_scores, 1)}
-            return tasks_data_size, tasks_model_size, tasks_epoch_number, tasks_computation_per_bit, tasks_privacy_scores
-
-
-def init_parameters(load_ratio, load_cycles, iter, params, params_path):
+        approved = required_comp < load_budget
+        block = [column[approved] for column in (data_size, model_size, epoch_number, computation_per_bit,
+                                                 privacy_score)]
+
+        if n_tasks is not None:
+            blocks.append(block)
+            count += len(block[0])
+            if count >= n_tasks:
+                return tuple(np.concatenate(columns)[:n_tasks] for columns in zip(*blocks))
+            block_size *= 2
+            continue
+
+        # generation stops with the first approved task that takes the total load over the budget
+        cumulative_comp = total_comp + np.cumsum(required_comp[approved])
+        over_budget = np.flatnonzero(cumulative_comp > load_budget)
+        if len(over_budget):
+            blocks.append([column[:over_budget[0] + 1] for column in block])
+            return tuple(np.concatenate(columns) for columns in zip(*blocks))
+
+        blocks.append(block)
+        if len(cumulative_comp):
+            total_comp = cumulative_comp[-1]
+        block_size *= 2
+
+
+def init_parameters(load_ratio, load_cycles, iter, params, params_path, seed=None):
     load_budget = params['comp_rsc'] * load_cycles
 
     tasks_data_size, tasks_model_size, tasks_epoch_number, tasks_computation_per_bit, tasks_privacy_scores = task_generator(params, load_budget)
 
     number_of_tasks = len(tasks_data_size)
 
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_data.pickle'), 'wb') as f:
-        pickle.dump(tasks_data_size, f)
-
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_model.pickle'), 'wb') as f:
-        pickle.dump(tasks_model_size, f)
-
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_computation.pickle'), 'wb') as f:
-        pickle.dump(tasks_computation_per_bit, f)
-
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_epoch.pickle'), 'wb') as f:
-        pickle.dump(tasks_epoch_number, f)
-
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_privacy_score.pickle'), 'wb') as f:
-        pickle.dump(tasks_privacy_scores, f)
-
     tasks_time_budget = generate_random_time_budget(number_of_tasks, params['time_budget_l'], params['time_budget_u'])
-    with open(os.path.join(params_path, f'{load_ratio}', f'{iter}_time.pickle'), 'wb') as f:
-        pickle.dump(tasks_time_budget, f)
 
     tasks_ids = tasks_ids_initialization(number_of_tasks)
 
-    # set no-offloading for all the tasks
-    n_tasks = len(tasks_data_size)
-    tasks_offloading_state = {i + 1: '' for i in range(n_tasks)}
+    # no task is forced to no-offloading
+    tasks = TaskTable(tasks_ids, tasks_data_size, tasks_time_budget, tasks_computation_per_bit, tasks_epoch_number,
+                      tasks_model_size, tasks_privacy_scores)
+    constant_params = [params['bandwidth'], params['backhaul'], params['comp_rsc']]
+
+    # the whole scenario goes to one file, so a stored sweep can be replayed without regenerating it
+    save_scenario(scenario_path(params_path, load_ratio, iter), constant_params, tasks, seed)
 
-    return [params['bandwidth'], params['backhaul'], params['comp_rsc']], [tasks_data_size, tasks_time_budget,
-                                                                           tasks_computation_per_bit,
-                                                                           tasks_epoch_number, tasks_model_size,
-                                                                           tasks_privacy_scores,
-                                                                           tasks_offloading_state, tasks_ids]
+    return constant_params, tasks
@@ -1,39 +1,219 @@
 import os
-import pickle
-import copy
+import time
+from functools import partial
 from ERAFL import erafl
-from ERAS import eras
+from ERAS import eras_closed_form
 from BOS_model import bos_model
 from EOS import eos
-from General_components.drop_task import drop_task
-from General_components.init_params import init_parameters
+from drop_task import DROP_POLICIES, bisect_admission, remove_task
+from prescreen import prescreen
+from direct import DIRECT_MODELS
+from decomposition import erafl_decomposition
+from heuristic import erafl_heuristic
+from orchestrator import RACE_CONFIGURATIONS, race as race_configurations
+from relaxation import RELAXATION_LEVELS, relaxation_bound, optimality_gap
+from incremental import PERSISTENT_MODELS, open_persistent, resolve, release_task
+from sweep import run_sweep
+from solution import Solution
+from results import save_result, load_result
+from result_cache import cache_key, fetch_result, store_result
+from telemetry import Telemetry
+from run_options import RunOptions
+from solvers import SOLVER_BACKENDS
 from validate_solution import check_constraints
 
 
-def model_executor(constant_params, paras, model_name, model_path, iteration):
-    range_params = copy.deepcopy(paras)
+def accept_model(model, status, model_name, constant_params, tasks):
+    # 'ok' is the status of the EOS baseline, which solves nothing and keeps every task
+    if status in ('optimal', 'ok'):
+        return True
+    if status in ('maxTimeLimit', 'locallyOptimal'):
+        return check_constraints(model, model_name, constant_params, tasks)
+    return False
+
+
+def model_executor(constant_params, paras, model_name, model_path, iteration, config_params_path, options=None):
+    # options is a RunOptions, the defaults when None; returns the Solution saved, solved or from the cache
+    start = time.perf_counter()
+    options = RunOptions() if options is None else options
+    solver_options, drop_policy, formulation, cache_path = \
+        options.solver_options, options.drop_policy, options.formulation, options.cache_path
+    # a relaxed optimum is fractional, so check_constraints would reject it and drop every task
+    backend = (solver_options or {}).get('backend', 'gurobi')
+    if SOLVER_BACKENDS[backend].get('relax'):
+        raise ValueError(f"the {backend} backend solves a relaxation, for benchmarks and bounds only")
+    # phase timings and solver statistics of the run go to one line of telemetry.jsonl in model_path
+    telemetry = Telemetry(model=model_name, model_path=model_path, iteration=iteration, tasks=len(paras),
+                          **options.settings())
+
+    model_output_name = os.path.join(model_path, f'{model_name}_{iteration}')
+
+    # a result cached for the same tasks, config, model settings and solver options is reused without solving
+    if cache_path is not None:
+        config_params = read_simulation_config(config_params_path) \
+            if config_params_path is not None and os.path.exists(config_params_path) else None
+        key = cache_key(constant_params, paras, model_name, config_params, solver_options, **options.settings())
+        if fetch_result(cache_path, key, model_output_name):
+            solution, meta = load_result(model_output_name)
+            telemetry.write(os.path.join(model_path, 'telemetry.jsonl'), status=meta['status'],
+                            admitted=len(solution.ids), objective=solution.objective, cached=True)
+            return solution
+
+    # the copy shares the task columns and only owns the active mask
+    tasks = paras.copy()
+
+    # with screen on, tasks that cannot fit by the closed-form capacity bounds are dropped before any model is
+    # built; not for EOS, which keeps every task and reports the ones past their time budget
+    if options.screen and model_name != 'EOS':
+        with telemetry.phase('prescreen'):
+            dropped = prescreen(constant_params, tasks, model_name)
+        if dropped:
+            print(f"pre-screen drops {len(dropped)} of {len(tasks)} tasks")
+            telemetry.record_drop('prescreen', dropped)
+        for task_id in dropped:
+            tasks = remove_task(tasks, task_id)
+
+    # every model takes (constant_params, tasks, solver_options), also those that solve nothing and ignore them
     model_mapper = {
-        'ERAFL': erafl,
-        'RAFS': eras,
-        'BOS': bos_model
+        'ERAFL': partial(erafl, formulation=formulation, telemetry=telemetry),
+        'RAFS': partial(eras_closed_form, telemetry=telemetry),
+        'BOS': partial(bos_model, telemetry=telemetry),
+        'EOS': partial(eos, telemetry=telemetry),
     }
-    model_output_name = os.path.join(model_path, f'{model_name}_{iteration}')
-    while True:
-        model, status = model_mapper[model_name](constant_params, range_params)
+    # the 'decomposition' formulation prices the three budgets and solves ERAFL per task, for large scenarios
+    if formulation == 'decomposition':
+        model_mapper['ERAFL'] = partial(erafl_decomposition, telemetry=telemetry)
+    # the 'heuristic' one solves nothing: a greedy NumPy allocation, for when a solver is too slow or absent
+    if formulation == 'heuristic':
+        model_mapper['ERAFL'] = partial(erafl_heuristic, telemetry=telemetry)
+    # build ERAFL and BOS with the gurobipy matrix API instead of Pyomo; the conic ERAFL has no direct build
+    direct = options.direct and model_name in DIRECT_MODELS and \
+        not (model_name == 'ERAFL' and formulation != 'bilinear')
+    if direct:
+        model_mapper[model_name] = partial(DIRECT_MODELS[model_name], telemetry=telemetry)
+    # race the configurations of RACE_CONFIGURATIONS on every solve and keep the first proven optimum; they
+    # solve the exact model, so an approximate ERAFL formulation is never raced
+    race = options.race and model_name in RACE_CONFIGURATIONS and \
+        not (model_name == 'ERAFL' and formulation != 'bilinear')
+    if race:
+        model_mapper[model_name] = partial(race_configurations, model_name=model_name, telemetry=telemetry)
+
+    def objective_stop(candidate):
+        # with a gap_tolerance the solver stops at the first incumbent that the relaxation bound of the
+        # candidate tasks proves to be within it of the optimum
+        if options.gap_tolerance is None or model_name not in RELAXATION_LEVELS:
+            return None
+        with telemetry.phase('relaxation'):
+            bound = relaxation_bound(constant_params, candidate, model_name)
+        return bound * (1 + options.gap_tolerance)
+
+    def run_model(candidate):
+        stop = objective_stop(candidate)
+        candidate_options = solver_options if stop is None else {**(solver_options or {}), 'objective_stop': stop}
+        return model_mapper[model_name](constant_params, candidate, candidate_options)
+
+    accepted_statuses = []
+
+    def solve(candidate):
+        model, status = run_model(candidate)
+        with telemetry.phase('validate'):
+            accepted = accept_model(model, status, model_name, constant_params, candidate)
+        if not accepted:
+            return None
+        accepted_statuses.append(status)
+        return model
 
-        if status == 'optimal':
-            with open(model_output_name, 'wb') as f:
-                pickle.dump(model, f)
-            return model
-        if status == 'maxTimeLimit':
-            result = check_constraints(model, model_name, iteration, config_params_path)
-            if result:
-                with open(model_output_name, 'wb') as f:
-                    pickle.dump(model, f)
-                return model
+    # keep one live model and release dropped tasks from it instead of rebuilding after every drop
+    # only the bilinear ERAFL is built for it, the conic one indexes its binaries by task and level
+    persistent = options.persistent and not direct and not race and model_name in PERSISTENT_MODELS and \
+        drop_policy != 'bisection' and not (model_name == 'ERAFL' and formulation != 'bilinear') and \
+        backend == 'gurobi'
+    # a pre-screen that drops every task leaves nothing to build the live model from
+    if persistent and len(tasks):
+        with telemetry.phase('build'):
+            live_model, opt = open_persistent(model_name, constant_params, tasks, solver_options)
 
-        # there is no optimal or feasible solution, so, drop task
-        range_params = drop_task(range_params, model)
+    attempt = 0
+    last_batch = []
+    while len(tasks):
+        if persistent:
+            stop = objective_stop(tasks)
+            solve_start = time.perf_counter()
+            with telemetry.phase('solve'):
+                model, status = resolve(live_model, opt, (solver_options or {}).get('tee', True), stop)
+            telemetry.record_solve(backend='gurobi_persistent', status=str(status),
+                                   solve_time=time.perf_counter() - solve_start)
+        else:
+            model, status = run_model(tasks)
+
+        with telemetry.phase('validate'):
+            accepted = accept_model(model, status, model_name, constant_params, tasks)
+        if not accepted:
+            # there is no optimal or feasible solution, so, drop tasks
+            if drop_policy == 'bisection':
+                found = bisect_admission(tasks, solve)
+                if found is None:
+                    # not even the lightest task alone is admitted
+                    print("bisection admits no task")
+                    model, status = None, 'infeasible'
+                else:
+                    # the search only accepts ever larger prefixes, so the last accepted solve is the one kept
+                    (model, tasks), status = found, accepted_statuses[-1]
+            else:
+                with telemetry.phase('drop'):
+                    dropped = DROP_POLICIES[drop_policy](tasks, model, constant_params, attempt, model_name)
+                telemetry.record_drop(attempt, dropped)
+                for task_id in dropped:
+                    if persistent:
+                        release_task(live_model, opt, task_id)
+                    tasks = remove_task(tasks, task_id)
+                last_batch = dropped
+                attempt += 1
+                continue
+        elif drop_policy == 'batch' and len(last_batch) > 1:
+            # the batch doubles with every infeasible solve, so it can drop more than needed. Its tasks are the
+            # heaviest, so the admitted ones are the lightest prefix and bisecting the prefixes past them takes
+            # back the lightest of the batch that still fit
+            found = bisect_admission(paras.keep(tasks.tasks_ids + list(last_batch)), solve, len(tasks))
+            if found is not None:
+                (model, tasks), status = found, accepted_statuses[-1]
+        break
+    else:
+        # every task was screened out or dropped, so there is nothing left to solve; a doubled batch can drop
+        # every remaining task at once, so the lightest of the last batch that still fit are taken back first
+        found = None
+        if drop_policy == 'batch' and len(last_batch):
+            found = bisect_admission(paras.keep(list(last_batch)), solve, 0)
+        if found is None:
+            print("no task can be admitted")
+            model, status = None, 'infeasible'
+        else:
+            (model, tasks), status = found, accepted_statuses[-1]
+
+    # released tasks keep their Vars on a persistent model, out of the solver, so only the admitted ones are kept
+    if model is None:
+        solution = Solution([], {})
+    elif isinstance(model, Solution):
+        solution = model
+    else:
+        solution = Solution.from_instance(model, tasks.tasks_ids if persistent else None)
+    dropped = sorted(set(paras.tasks_ids) - set(solution.ids.tolist()))
+
+    # the bound of the admitted tasks, as the optimum over more tasks can only be higher; it relaxes the
+    # continuous alpha of ERAFL, so the gap of an approximate formulation includes its grid error
+    bound = gap = None
+    if model_name in RELAXATION_LEVELS and solution.objective is not None:
+        with telemetry.phase('relaxation'):
+            bound = relaxation_bound(constant_params, paras.keep(solution.ids.tolist()), model_name)
+        gap = optimality_gap(solution.objective, bound)
+
+    with telemetry.phase('save'):
+        save_result(model_output_name, solution, status, time.perf_counter() - start, dropped, bound, gap)
+        if cache_path is not None:
+            store_result(cache_path, key, model_output_name)
+    telemetry.write(os.path.join(model_path, 'telemetry.jsonl'), status=str(status),
+                    admitted=len(solution.ids), objective=solution.objective, bound=bound, gap=gap)
+    return solution
 
 
 def read_simulation_config(path):
@@ -46,7 +226,6 @@ def read_simulation_config(path):
     return params
 
 
-
 if __name__ == '__main__':
     config_params_path = "../simulation_config.txt"
     config_params = read_simulation_config(config_params_path)
@@ -57,6 +236,12 @@ if __name__ == '__main__':
     comp_load_ratio = {'30': 100, '100': 300, '170': 500, '240': 700, '300': 1000}
     iterations = 2
 
+    # rerun the models on the scenarios stored by an earlier sweep instead of generating new ones
+    replay = False
+
+    # results of unchanged (scenario, model, settings) cells are taken from here instead of solving again
+    cache_path = "./result_cache"
+
     # Build directories
     if not os.path.exists(os.path.join(model_path)):
         os.makedirs(os.path.join(model_path))
@@ -66,19 +251,8 @@ if __name__ == '__main__':
         if not os.path.exists(os.path.join(params_path, f'{load_ratio}')):
             os.makedirs(os.path.join(params_path, f'{load_ratio}'))
 
-    for load_ratio,  load_cycles in comp_load_ratio.items():
-        for iteration in range(iterations):
-            print(f'iteration : {iteration}')
-            constant_parameters, range_parameters = init_parameters(load_ratio, load_cycles, iteration, config_params, params_path)
-
-            number_of_generated_tasks = len(range_parameters[0])
-            model_output_path = os.path.join(model_path, f'{load_ratio}')
-
-            bos_m = model_executor(constant_parameters, range_parameters, 'BOS', model_output_path, iteration)
-
-            cc_m = model_executor(constant_parameters, range_parameters, 'ERAFL', model_output_path, iteration)
-
-            rafs_m = model_executor(constant_parameters, range_parameters, 'RAFS', model_output_path, iteration)
-
-            ccfs_m = eos(constant_parameters, range_parameters)[0]
-
+    # (load_ratio, iteration, model) jobs run in parallel, with the threads per solve and the number of
+    # workers planned from the core count and the scenario sizes; the solver logs are off since the
+    # statistics of every solve go to telemetry.jsonl
+    run_sweep(comp_load_ratio, iterations, config_params, config_params_path, model_path, params_path,
+              replay=replay, options=RunOptions(solver_options={'tee': False}, cache_path=cache_path))
@@ -0,0 +1,191 @@
+import heapq
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from ERAFL import erafl
+from solution import Solution
+from validate_solution import check_constraints
+
+# share of a task's time budget the heuristic plans for each transfer, upload and model; the rest is
+# left for local training
+TRANSFER_FRACTION = 0.25
+
+
+def arrival_times(n, rate):
+    # Poisson arrivals, rate tasks per time unit
+    return np.cumsum(np.random.exponential(1 / rate, n))
+
+
+def offloaded_data(D, needed):
+    # the smallest ERAFL choice that offloads at least needed: nothing, alpha in [0.3, 0.7], or everything
+    fraction = needed / D
+    if fraction <= 0:
+        return 0.0
+    if fraction <= 0.7:
+        return max(fraction, 0.3) * D
+    return D
+
+
+def heuristic_allocation(free, D, t, Z, e, M, no_offloading, minimum_share=0.001):
+    # B, bB, F, D_o of one arriving task from the free budgets, or None when it cannot fit
+    free_bandwidth, free_backhaul, free_cpu = free
+    if min(free) < minimum_share:
+        return None
+
+    B = min(max(D / (TRANSFER_FRACTION * t), minimum_share), free_bandwidth)
+    bB = min(max(M / (TRANSFER_FRACTION * t), minimum_share), free_backhaul)
+    compute_time = t - D / B - M / bB
+    if compute_time <= 0:
+        return None
+
+    # train locally when the CPU is there, otherwise offload as little as the CPU left allows
+    F = max(e * Z * D / compute_time, minimum_share)
+    D_o = 0.0
+    if F > free_cpu:
+        if no_offloading:
+            return None
+        F = free_cpu
+        D_o = offloaded_data(D, D - compute_time * F / (e * Z))
+
+    # the offloaded data goes over the backhaul within what the upload leaves of the budget
+    if D_o > 0:
+        bB = max(bB, D_o / (t - D / B))
+        if bB > free_backhaul or D / B + e * (D - D_o) * Z / F + M / bB > t:
+            return None
+    return B, bB, F, D_o
+
+
+class OnlineAdmission:
+    # allocation state of the hub: tasks are rows of a TaskTable whose active mask marks the tasks being
+    # served, and the per-row shares are NaN for the others
+
+    def __init__(self, constant_params, tasks, solver=erafl, solver_options=None, resolve_interval=None,
+                 resolve_latency=0.0):
+        self.constant_params = np.asarray(constant_params, dtype=float)
+        self.tasks = tasks.copy()
+        self.tasks.active[:] = False
+        n = len(tasks.ids)
+        self.allocation = {name: np.full(n, np.nan) for name in ('B', 'bB', 'F', 'D_o')}
+        self.departures = []
+        self.solver = solver
+        self.solver_options = solver_options
+        self.resolve_interval = resolve_interval
+        # simulated time a re-solve takes: its result is applied at the first event from then on, waiting for
+        # the solver if it is still running, so the stream sees it whatever the wall-clock time of the solve
+        self.resolve_latency = resolve_latency
+        self.last_resolve = 0.0
+        self.pending = None
+        self.pool = ThreadPoolExecutor(max_workers=1)
+        self.stats = {'admitted': 0, 'rejected': 0, 'resolves_started': 0, 'resolves_applied': 0}
+        self.latencies = []
+
+    def free(self):
+        used = [np.nansum(self.allocation[name]) for name in ('B', 'bB', 'F')]
+        return self.constant_params - np.array(used)
+
+    def arrive(self, row, now):
+        start = time.perf_counter()
+        tasks = self.tasks
+        allocation = heuristic_allocation(self.free(), tasks.D[row], tasks.t[row], tasks.Z[row], tasks.e[row],
+                                          tasks.M[row], tasks.no_offloading[row])
+        if allocation is None:
+            self.stats['rejected'] += 1
+        else:
+            for name, value in zip(('B', 'bB', 'F', 'D_o'), allocation):
+                self.allocation[name][row] = value
+            tasks.active[row] = True
+            # the task holds its shares until its training round is due
+            heapq.heappush(self.departures, (now + tasks.t[row], row))
+            self.stats['admitted'] += 1
+        self.latencies.append(time.perf_counter() - start)
+        return allocation is not None
+
+    def depart(self, now):
+        while self.departures and self.departures[0][0] <= now:
+            _, row = heapq.heappop(self.departures)
+            self.tasks.active[row] = False
+            for values in self.allocation.values():
+                values[row] = np.nan
+
+    def maybe_resolve(self, now):
+        self.apply_resolve(now)
+        if self.resolve_interval is None or self.pending is not None or len(self.tasks) == 0:
+            return
+        if now - self.last_resolve < self.resolve_interval:
+            return
+        # the solver works on a copy of the current task set while admissions go on with the heuristic
+        self.last_resolve = now
+        snapshot = self.tasks.copy()
+        future = self.pool.submit(self.solver, self.constant_params.tolist(), snapshot, self.solver_options)
+        self.pending = (snapshot, future, now + self.resolve_latency)
+        self.stats['resolves_started'] += 1
+
+    def apply_resolve(self, now=None):
+        # now=None applies the pending re-solve whenever it completes, at the end of the stream
+        if self.pending is None or (now is not None and now < self.pending[2]):
+            return
+        snapshot, future, _ = self.pending
+        self.pending = None
+        try:
+            model, status = future.result()
+        except Exception as e:
+            print(f"background re-solve failed: {e}")
+            return
+        if status != 'optimal' and not (status in ('maxTimeLimit', 'locallyOptimal') and
+                                        check_constraints(model, 'ERAFL', self.constant_params, snapshot)):
+            return
+
+        solution = model if isinstance(model, Solution) else Solution.from_instance(model)
+        rows = np.searchsorted(self.tasks.ids, solution.ids)
+        # tasks that left meanwhile are skipped, and the result is only taken if it still fits next to the
+        # tasks admitted since the snapshot
+        still_active = self.tasks.active[rows]
+        proposed = {name: self.allocation[name].copy() for name in self.allocation}
+        for name in proposed:
+            proposed[name][rows[still_active]] = np.asarray(solution[name])[still_active]
+        used = np.array([np.nansum(proposed[name]) for name in ('B', 'bB', 'F')])
+        if np.all(used <= self.constant_params * (1 + 1e-9)):
+            self.allocation = proposed
+            self.stats['resolves_applied'] += 1
+
+    def metrics(self):
+        latencies = np.array(self.latencies)
+        served = ~np.isnan(self.allocation['D_o'])
+        return {
+            **self.stats,
+            'admitted_ratio': self.stats['admitted'] / max(len(latencies), 1),
+            'latency_mean': float(latencies.mean()) if len(latencies) else None,
+            'latency_p99': float(np.percentile(latencies, 99)) if len(latencies) else None,
+            'latency_max': float(latencies.max()) if len(latencies) else None,
+            'privacy_cost_now': float(np.sum(self.tasks.P[served] * self.allocation['D_o'][served])),
+        }
+
+
+def simulate(constant_params, tasks, arrivals, solver=erafl, solver_options=None, resolve_interval=None,
+             resolve_latency=0.0):
+    # tasks arrive in id order at the given times; departures and finished re-solves are handled before each
+    # arrival
+    hub = OnlineAdmission(constant_params, tasks, solver, solver_options, resolve_interval, resolve_latency)
+    admission_privacy_cost = 0.0
+    for row, now in enumerate(arrivals):
+        hub.depart(now)
+        hub.maybe_resolve(now)
+        if hub.arrive(row, now):
+            # as allocated on arrival; a later re-solve may lower it
+            admission_privacy_cost += hub.tasks.P[row] * hub.allocation['D_o'][row]
+    hub.apply_resolve()
+    hub.pool.shutdown()
+    return {**hub.metrics(), 'admission_privacy_cost': float(admission_privacy_cost)}
+
+
+if __name__ == '__main__':
+    from main import read_simulation_config
+    from benchmark import benchmark_scenario
+
+    config_params = read_simulation_config("../simulation_config.txt")
+
+    # a stream of 1000 tasks on the configured budgets, one arrival per 20 time units on average
+    _, tasks = benchmark_scenario(config_params, 1000, seed=0)
+    constant_params = [config_params['bandwidth'], config_params['backhaul'], config_params['comp_rsc']]
+    print(simulate(constant_params, tasks, arrival_times(len(tasks.ids), rate=0.05), resolve_interval=200,
+                   resolve_latency=50, solver_options={'time_limit': 10, 'tee': False}))
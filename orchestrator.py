@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+from functools import partial
+import numpy as np
+from pyomo.opt import TerminationCondition
+from ERAFL import erafl
+from BOS_model import bos_model
+from direct import DIRECT_MODELS
+from solution import Solution, RESULT_VARS
+from solvers import DEFAULT_SOLVER_OPTIONS
+from validate_solution import check_constraints, AUXILIARIES
+
+# threads one solve gets by number of tasks, up to MAX_THREADS_PER_SOLVE
+THREADS_BY_SIZE = ((50, 1), (500, 2), (5000, 4))
+MAX_THREADS_PER_SOLVE = 8
+
+# (label, model, solver options) raced on the same instance; all solve the exact model, so no approximate
+# formulation races
+RACE_CONFIGURATIONS = {
+    'ERAFL': [
+        ('bilinear', erafl, {}),
+        ('bilinear_presolve', erafl, {'native': {'Presolve': -1}}),
+    ],
+    'BOS': [
+        ('warm_start', bos_model, {}),
+        ('cold_start', partial(bos_model, warm_start=False), {}),
+        ('feasibility_focus', bos_model, {'native': {'MIPFocus': 1}}),
+    ],
+}
+for name, direct_model in DIRECT_MODELS.items():
+    RACE_CONFIGURATIONS[name].append(('direct', direct_model, {}))
+
+# time a raced solve gets past the time limit to build its model and report back
+RACE_GRACE = 30
+
+
+def available_cores():
+    # the cores this process may run on, which can be fewer than the machine has
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def plan_threads(n_tasks, cores=None, solves=1):
+    # (concurrent jobs, threads per job), where each job runs solves solves at once
+    cores = cores or available_cores()
+    threads = next((threads for size, threads in THREADS_BY_SIZE if n_tasks <= size), MAX_THREADS_PER_SOLVE)
+    threads = min(threads * solves, cores)
+    return max(1, cores // threads), threads
+
+
+def race_size(model_names):
+    # the most solves a race of any of model_names runs at once
+    return max((len(RACE_CONFIGURATIONS[name]) for name in model_names if name in RACE_CONFIGURATIONS), default=1)
+
+
+def race_worker(results, index, model, constant_params, tasks, solver_options):
+    # a process group of its own, so that stopping the solve also stops its solver processes
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    try:
+        output, status = model(constant_params, tasks, solver_options)
+        solution = output if isinstance(output, Solution) else \
+            Solution.from_instance(output, tasks.tasks_ids, RESULT_VARS + tuple(AUXILIARIES))
+        results.put((index, solution, str(status)))
+    except Exception as e:
+        results.put((index, None, f'error: {e}'))
+
+
+def stop_solve(process):
+    # kills the process group of a race_worker, else only the worker
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.terminate()
+
+
+def race_options(settings, options, threads):
+    # a configuration's options over the caller's, the 'native' ones key by key
+    native = {**settings.get('native', {}), **options.get('native', {})}
+    return {**settings, **options, 'native': native, 'threads': threads}
+
+
+def race(constant_params, tasks, solver_options=None, model_name='ERAFL', configurations=None, cores=None,
+         telemetry=None):
+    # solves the same tasks with every configuration at once, each in its own process; the first proven
+    # optimum wins, else the best incumbent that passes check_constraints
+    configurations = RACE_CONFIGURATIONS[model_name] if configurations is None else configurations
+    settings = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}
+    cores = cores or settings['threads'] or available_cores()
+    threads = max(1, cores // len(configurations))
+
+    results = multiprocessing.Queue()
+    processes = []
+    start = time.perf_counter()
+    for index, (label, model, options) in enumerate(configurations):
+        process_options = race_options(settings, options, threads)
+        process = multiprocessing.Process(target=race_worker, daemon=True,
+                                          args=(results, index, model, constant_params, tasks, process_options))
+        process.start()
+        processes.append(process)
+
+    winner, statuses = None, []
+    try:
+        deadline = start + settings['time_limit'] + RACE_GRACE
+        while len(statuses) < len(processes):
+            try:
+                index, solution, status = results.get(timeout=max(deadline - time.perf_counter(), 0))
+            except queue.Empty:
+                print("race timed out")
+                break
+            statuses.append(status)
+            if telemetry is not None:
+                telemetry.record_solve(backend=f'race:{configurations[index][0]}', status=status,
+                                       solve_time=time.perf_counter() - start)
+            if status == 'optimal':
+                winner = (solution, status, configurations[index][0])
+                break
+            if status in ('maxTimeLimit', 'locallyOptimal') and solution.objective is not None and \
+                    check_constraints(solution, model_name, constant_params, tasks):
+                if winner is None or solution.objective < winner[0].objective:
+                    winner = (solution, status, configurations[index][0])
+    finally:
+        # the solves still running lost
+        for process in processes:
+            if process.is_alive():
+                stop_solve(process)
+            process.join()
+
+    if winner is not None:
+        solution, status, label = winner
+        print(f"race won by {label}: {status} with objective {solution.objective}")
+        return solution, status
+    n = len(tasks)
+    status = TerminationCondition.infeasible if statuses and all(status == 'infeasible' for status in statuses) \
+        else TerminationCondition.maxTimeLimit
+    return Solution(tasks.tasks_ids, {name: np.full(n, np.nan) for name in RESULT_VARS}), status
@@ -0,0 +1,67 @@
+import numpy as np
+
+# lower bound of every per-task share variable (B, bB, F) in each model; RAFS splits the budgets equally
+MINIMUM_SHARE = {'ERAFL': 0.001, 'BOS': 1, 'RAFS': 0}
+
+# offloaded fractions of ERAFL on a grid: no offloading, a grid over the (0.3, 0.7) range of alpha, and full
+# offloading; the conic formulation, the decomposition and the heuristic choose alpha from them
+OFFLOADING_LEVELS = (0.0, 0.3, 0.35, 0.4, 0.45, 0.5, 0.55, 0.6, 0.65, 0.7, 1.0)
+
+
+def task_arrays(tasks):
+    # data size, time budget, computation per bit, epochs, model size of the active tasks
+    return tasks.ids[tasks.active], [tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M')]
+
+
+def alone_feasible(constant_params, D, t, M):
+    bandwidth_budget, backhaul_bandwidth_budget, _ = constant_params
+
+    # every offloading choice keeps D/B + M/bB <= t from time_budget1, so a task that misses it even
+    # with the whole of both links can never be admitted
+    return D / bandwidth_budget + M / backhaul_bandwidth_budget <= t
+
+
+def admissible_count(constant_params, D, t, M, minimum_share=0, equal_share=False):
+    # D, t and M are in admission order; returns how many leading tasks can pass the capacity bounds
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    n = len(D)
+    if n == 0:
+        return 0
+    admitted = np.arange(1, n + 1)
+    upload = D / bandwidth_budget
+    backhaul = M / backhaul_bandwidth_budget
+
+    if equal_share:
+        # with k tasks each gets 1/k of every budget, so time_budget1 needs k * (upload + backhaul) <= t
+        fits = np.minimum.accumulate(t / (upload + backhaul)) >= admitted
+    else:
+        # time_budget1 forces B >= D/t and bB >= M/t, and the shares that satisfy D/B + M/bB <= t use at
+        # least (sqrt(D/Bw) + sqrt(M/Bh))^2 / t of the two budgets together
+        fits = (np.cumsum(np.maximum(D / t, minimum_share)) <= bandwidth_budget) & \
+            (np.cumsum(np.maximum(M / t, minimum_share)) <= backhaul_bandwidth_budget) & \
+            (admitted * minimum_share <= cpu_cycle_frequency) & \
+            (np.cumsum((np.sqrt(upload) + np.sqrt(backhaul)) ** 2 / t) <= 2)
+
+    # the bounds only grow with every admitted task, so fits is True up to some point and False after it
+    return n if fits.all() else int(np.argmin(fits))
+
+
+def prescreen(constant_params, tasks, model_name):
+    # ids of the tasks to drop before any solve: those no solve can admit even alone, and then those past the
+    # longest lightest-first prefix of the others that passes the capacity bounds. This is not the set the
+    # drop loop would remove. drop_single gives up the heaviest task first, so a light task that cannot fit
+    # alone keeps every solve infeasible until all heavier tasks are gone, where the pre-screen drops only
+    # that task; the admitted tasks, and so the results, can differ from a run without it
+    tasks_ids, (D, t, Z, e, M) = task_arrays(tasks)
+
+    alone = alone_feasible(constant_params, D, t, M)
+
+    # among the tasks that fit alone, the ones past the admissible prefix are those drop_single would
+    # remove anyway, one infeasible solve at a time
+    order = np.argsort(D * Z * e, kind='stable')
+    order = order[alone[order]]
+    count = admissible_count(constant_params, D[order], t[order], M[order], MINIMUM_SHARE[model_name],
+                             equal_share=model_name == 'RAFS')
+
+    dropped = np.concatenate([tasks_ids[~alone], tasks_ids[order[count:]][::-1]])
+    return dropped.tolist()
@@ -0,0 +1,62 @@
+import numpy as np
+from prescreen import OFFLOADING_LEVELS
+from decomposition import task_problems, dual_step
+
+# offloaded fractions of each model; BOS offloads all or nothing
+RELAXATION_LEVELS = {'ERAFL': OFFLOADING_LEVELS, 'BOS': (0.0, 1.0)}
+
+# subgradient steps of the dual bound, as in decomposition
+RELAXATION_OPTIONS = {'iterations': 100, 'step': 2.0, 'patience': 10}
+
+
+def alone_bound(constant_params, tasks, model_name):
+    # the least each task must offload even with all of every budget to itself, from time_budget1
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    D, t, Z, e, M, P = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M', 'P'))
+    needed = 1 - (t - D / bandwidth_budget - M / backhaul_bandwidth_budget) * cpu_cycle_frequency / (e * Z * D)
+
+    # rounded up to the fractions the model allows: 0, [0.3, 0.7] or 1 in ERAFL, 0 or 1 in BOS
+    if model_name == 'ERAFL':
+        fraction = np.where(needed <= 0, 0, np.where(needed <= 0.7, np.maximum(needed, 0.3), 1))
+    else:
+        fraction = (needed > 0).astype(float)
+    fraction[tasks.no_offloading[tasks.active]] = 0
+    return float(np.sum(P * D * fraction))
+
+
+def lagrangian_bound(constant_params, tasks, model_name, target=None, relaxation_options=None):
+    # the dual bound of decomposition, without its primal side; target defaults to offloading everything
+    options = {**RELAXATION_OPTIONS, **(relaxation_options or {})}
+    problem = task_problems(tasks, RELAXATION_LEVELS[model_name])
+    budgets = np.asarray(constant_params, dtype=float)
+    ceiling = float(np.sum(problem['P'] * problem['D']))
+    target = ceiling if target is None else target
+    floor = 1e-12 * max(ceiling, 1e-12)
+
+    prices = np.full(3, max(target, floor) / 3)
+    lower, step, stall = 0.0, options['step'], 0
+    for _ in range(options['iterations'] if len(tasks) else 0):
+        value, usage, _ = dual_step(problem, prices, budgets, floor)
+        if value > lower * (1 + 1e-9) + 1e-12:
+            lower, stall = value, 0
+        else:
+            stall += 1
+            if stall >= options['patience']:
+                step, stall = step / 2, 0
+        prices = np.maximum(prices + step * (max(target, lower) - value) / max(usage @ usage, 1e-12) * usage, 0)
+    return lower
+
+
+def relaxation_bound(constant_params, tasks, model_name, target=None):
+    # a lower bound on the optimum of ERAFL or BOS over tasks, without solving the MINLP
+    if len(tasks) == 0:
+        return 0.0
+    return max(alone_bound(constant_params, tasks, model_name),
+               lagrangian_bound(constant_params, tasks, model_name, target))
+
+
+def optimality_gap(objective, bound):
+    # relative, as Gurobi reports it
+    if objective is None or bound is None:
+        return None
+    return max(objective - bound, 0) / max(abs(objective), 1e-10)
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from task_table import COLUMNS
+
+# the cache keeps the most recently used results up to this many bytes
+CACHE_MAX_BYTES = 2 * 2**30
+
+# solver options that do not define a result; threads is the sweep's plan for the cores at hand, and keying
+# on it would throw the cache away whenever the number of workers or cores changes
+IGNORED_OPTIONS = ('tee', 'threads')
+
+
+def cache_key(constant_params, tasks, model_name, config_params=None, solver_options=None, **settings):
+    # digest of everything a result depends on: the active tasks, the budgets, the simulation config, the
+    # model and its settings (formulation, drop policy, ...) and the solver options
+    digest = hashlib.sha256()
+    digest.update(np.ascontiguousarray(tasks.ids[tasks.active]).tobytes())
+    for name in COLUMNS:
+        digest.update(np.ascontiguousarray(tasks.column(name)).tobytes())
+    digest.update(np.ascontiguousarray(tasks.no_offloading[tasks.active]).tobytes())
+    options = {key: value for key, value in (solver_options or {}).items() if key not in IGNORED_OPTIONS}
+    digest.update(json.dumps({'constant_params': [float(value) for value in constant_params],
+                              'config_params': config_params, 'model': model_name, 'settings': settings,
+                              'solver_options': options}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def cache_files(cache_path, key):
+    return [os.path.join(cache_path, f'{key}{extension}') for extension in ('.npy', '.json')]
+
+
+def fetch_result(cache_path, key, path):
+    # copies a cached result to path (no extension) as save_result writes it; False on a miss
+    try:
+        for cached, target in zip(cache_files(cache_path, key), cache_files(*os.path.split(path))):
+            shutil.copyfile(cached, target)
+            # the modification time is the last use, which eviction goes by
+            os.utime(cached)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def store_result(cache_path, key, path, max_bytes=CACHE_MAX_BYTES):
+    # copies the result saved at path into the cache; through a temporary name, so parallel sweep workers
+    # never see half a file
+    os.makedirs(cache_path, exist_ok=True)
+    for source, cached in zip(cache_files(*os.path.split(path)), cache_files(cache_path, key)):
+        temporary = f'{cached}.{os.getpid()}.tmp'
+        shutil.copyfile(source, temporary)
+        os.replace(temporary, cached)
+    evict(cache_path, max_bytes)
+
+
+def evict(cache_path, max_bytes=CACHE_MAX_BYTES):
+    # removes the least recently used results until the cache fits in max_bytes
+    entries = dict()
+    for name in os.listdir(cache_path):
+        key, extension = os.path.splitext(name)
+        if extension not in ('.npy', '.json'):
+            continue
+        try:
+            stat = os.stat(os.path.join(cache_path, name))
+        except FileNotFoundError:
+            continue
+        last_use, size = entries.get(key, (0, 0))
+        entries[key] = (max(last_use, stat.st_mtime), size + stat.st_size)
+
+    total = sum(size for _, size in entries.values())
+    for key, (_, size) in sorted(entries.items(), key=lambda entry: entry[1][0]):
+        if total <= max_bytes:
+            break
+        for cached in cache_files(cache_path, key):
+            try:
+                os.remove(cached)
+            except FileNotFoundError:
+                pass
+        total -= size
@@ -0,0 +1,46 @@
+import json
+import os
+import numpy as np
+from solution import Solution, RESULT_VARS
+
+# the variables, then the completion time and whether it is past the time budget where a model computes them
+# (EOS), NaN for the others
+RESULT_COLUMNS = RESULT_VARS + ('t_c', 'missed')
+
+# one row per admitted task, as in scenario_store
+RESULT_DTYPE = np.dtype([('id', np.int64)] + [(name, np.float64) for name in RESULT_COLUMNS])
+
+
+def save_result(path, solution, status, solve_time, dropped, bound=None, gap=None):
+    # path has no extension; the .npy holds the rows of the admitted tasks and a .json sidecar the scalars of
+    # the solve. bound is a lower bound on the optimum over the admitted tasks and gap the objective's relative
+    # distance to it, where the model has a relaxation
+    n = len(solution.ids)
+    rows = np.empty(n, dtype=RESULT_DTYPE)
+    rows['id'] = solution.ids
+    for name in RESULT_COLUMNS:
+        rows[name] = solution.values.get(name, np.full(n, np.nan))
+    np.save(f'{path}.npy', rows)
+
+    objective = solution.objective
+    with open(f'{path}.json', 'w') as f:
+        json.dump({'objective': None if objective is None else float(objective), 'status': str(status),
+                   'solve_time': solve_time, 'dropped': [int(task_id) for task_id in dropped], 'bound': bound,
+                   'gap': gap}, f)
+
+
+def load_result(path, names=RESULT_COLUMNS, mmap=True):
+    # the columns are views of the memory-mapped rows, so only the ids and the columns in names are read
+    rows = np.load(f'{path}.npy', mmap_mode='r' if mmap else None)
+    ids = rows['id']
+    # results saved before t_c and missed were recorded leave them NaN
+    values = {name: rows[name] if name in rows.dtype.names else np.full(len(ids), np.nan) for name in names}
+    with open(f'{path}.json') as f:
+        meta = json.load(f)
+    return Solution(ids, values, meta['objective']), meta
+
+
+def result_paths(model_path):
+    # extensionless paths of the results saved in a directory, e.g. test_models/<load_ratio>
+    return sorted(os.path.join(model_path, name[:-len('.json')]) for name in os.listdir(model_path)
+                  if name.endswith('.json') and os.path.exists(os.path.join(model_path, name[:-5] + '.npy')))
@@ -0,0 +1,26 @@
+from dataclasses import dataclass, asdict
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    # settings of a model_executor run, passed whole from run_sweep through run_job. solver_options are
+    # the normalized options of solvers.py; persistent keeps one live model across drops; drop_policy is a
+    # key of DROP_POLICIES or 'bisection'; screen drops the tasks prescreen finds infeasible before any
+    # solve; formulation picks the ERAFL solve, the exact 'bilinear' or one of the approximations 'conic'
+    # (alpha on a grid), 'decomposition' and 'heuristic'; direct builds with the gurobipy matrix API;
+    # cache_path is the result cache, None for none; race solves every configuration of RACE_CONFIGURATIONS
+    # at once; gap_tolerance stops a solve within it of the relaxation bound. screen is off by default, as
+    # the pre-screen can admit other tasks than the drop loop alone
+    solver_options: dict = None
+    persistent: bool = False
+    drop_policy: str = 'single'
+    screen: bool = False
+    formulation: str = 'bilinear'
+    direct: bool = False
+    cache_path: str = None
+    race: bool = False
+    gap_tolerance: float = None
+
+    def settings(self):
+        # the model settings a result depends on, apart from the solver options
+        return {name: value for name, value in asdict(self).items() if name not in ('solver_options', 'cache_path')}
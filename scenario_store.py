@@ -0,0 +1,36 @@
+import json
+import os
+import numpy as np
+from task_table import TaskTable, COLUMNS
+
+# one row per task; the .npy holds the rows and a .json sidecar the budgets and the seed of the scenario
+SCENARIO_DTYPE = np.dtype([('id', np.int64)] + [(name, np.float64) for name in COLUMNS] +
+                          [('no_offloading', np.bool_)])
+
+CONSTANT_PARAMS = ('bandwidth', 'backhaul', 'comp_rsc')
+
+
+def scenario_path(params_path, load_ratio, iteration):
+    # extensionless, as in results.save_result
+    return os.path.join(params_path, f'{load_ratio}', f'{iteration}_scenario')
+
+
+def save_scenario(path, constant_params, tasks, seed=None):
+    rows = np.empty(len(tasks.ids), dtype=SCENARIO_DTYPE)
+    rows['id'] = tasks.ids
+    for name in COLUMNS:
+        rows[name] = getattr(tasks, name)
+    rows['no_offloading'] = tasks.no_offloading
+    np.save(f'{path}.npy', rows)
+
+    with open(f'{path}.json', 'w') as f:
+        json.dump({**dict(zip(CONSTANT_PARAMS, map(float, constant_params))), 'seed': seed}, f)
+
+
+def load_scenario(path, mmap=True):
+    # the TaskTable columns are views of the memory-mapped rows, so a task's values are read on first use
+    rows = np.load(f'{path}.npy', mmap_mode='r' if mmap else None)
+    with open(f'{path}.json') as f:
+        meta = json.load(f)
+    tasks = TaskTable(rows['id'], *(rows[name] for name in COLUMNS), no_offloading=rows['no_offloading'])
+    return [meta[name] for name in CONSTANT_PARAMS], tasks, meta['seed']
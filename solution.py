@@ -0,0 +1,35 @@
+import numpy as np
+import pyomo.environ as pyo
+
+# per-task variables kept from a solved model, shared by every model; a model without one (BOS has no b1
+# or b2) leaves it NaN
+RESULT_VARS = ('F', 'B', 'bB', 'alpha', 'b1', 'b2', 'D_o')
+
+
+class Solution:
+    # variable values of a solved model as arrays aligned with ids, for the solvers that compute an
+    # allocation directly instead of building a Pyomo model
+
+    def __init__(self, ids, values, objective=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.values = values
+        self.objective = objective
+
+    @classmethod
+    def from_instance(cls, instance, ids=None, names=RESULT_VARS):
+        # ids defaults to every task of the instance; a persistent model still holds the released ones
+        ids = list(instance.i) if ids is None else list(ids)
+        values = dict()
+        for name in names:
+            # Vars, or Params where a model fixes the allocation (the Pyomo RAFS)
+            component = getattr(instance, name, None)
+            column = [np.nan] * len(ids) if component is None else \
+                [pyo.value(component[i], exception=False) for i in ids]
+            values[name] = np.array([np.nan if value is None else value for value in column], dtype=float)
+        return cls(ids, values, pyo.value(instance.OBJ, exception=False))
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def as_dict(self, name):
+        return dict(zip(self.ids.tolist(), self.values[name].tolist()))
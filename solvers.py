@@ -0,0 +1,148 @@
+import os
+import tempfile
+import time
+import pyomo.environ as pyo
+from pyomo.opt import TerminationCondition
+from telemetry import timed, solve_stats
+
+# Pyomo solver name of each backend and its native names for the normalized options; None when the
+# backend has no such option. relax solves the continuous relaxation, for local NLP solvers in the benchmarks,
+# and model_executor rejects it; local marks the backends that only prove local optima, so their 'optimal' is
+# taken as locallyOptimal and validated
+SOLVER_BACKENDS = {
+    'gurobi': {'solver': 'gurobi', 'time_limit': 'TimeLimit', 'threads': 'Threads', 'mip_gap': 'MIPGap',
+               'seed': 'Seed', 'objective_stop': 'BestObjStop'},
+    'scip': {'solver': 'scip', 'time_limit': 'limits/time', 'threads': 'parallel/maxnthreads',
+             'mip_gap': 'limits/gap', 'seed': 'randomization/randomseedshift', 'objective_stop': None},
+    'highs': {'solver': 'appsi_highs', 'time_limit': 'time_limit', 'threads': 'threads', 'mip_gap': 'mip_rel_gap',
+              'seed': 'random_seed', 'objective_stop': None},
+    'couenne': {'solver': 'couenne', 'time_limit': 'time_limit', 'threads': None,
+                'mip_gap': 'allowable_fraction_gap', 'seed': None, 'objective_stop': None},
+    'bonmin': {'solver': 'bonmin', 'time_limit': 'bonmin.time_limit', 'threads': None,
+               'mip_gap': 'bonmin.allowable_fraction_gap', 'seed': None, 'objective_stop': None, 'local': True},
+    'ipopt': {'solver': 'ipopt', 'time_limit': 'max_cpu_time', 'threads': None, 'mip_gap': None, 'seed': None,
+              'objective_stop': None, 'relax': True, 'local': True},
+}
+
+DEFAULT_SOLVER_OPTIONS = {'backend': 'gurobi', 'time_limit': 60, 'threads': None, 'mip_gap': None, 'seed': None,
+                          'objective_stop': None, 'tee': True}
+
+# termination conditions folded into the statuses model_executor acts on
+STATUS_MAP = {
+    TerminationCondition.globallyOptimal: TerminationCondition.optimal,
+    TerminationCondition.infeasibleOrUnbounded: TerminationCondition.infeasible,
+    TerminationCondition.maxIterations: TerminationCondition.maxTimeLimit,
+    TerminationCondition.maxEvaluations: TerminationCondition.maxTimeLimit,
+}
+
+
+def native_options(solver_options=None, model_options=None):
+    # solver_options holds the normalized options, plus any raw ones under 'native'; model_options maps a
+    # backend to the native options a model always needs on it, e.g. NonConvex for Gurobi
+    settings = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}
+    backend = SOLVER_BACKENDS[settings['backend']]
+
+    options = dict((model_options or {}).get(settings['backend'], {}))
+    for option in ('time_limit', 'threads', 'mip_gap', 'seed', 'objective_stop'):
+        if settings[option] is not None and backend[option] is not None:
+            options[backend[option]] = settings[option]
+    options.update(settings.get('native', {}))
+    return settings['backend'], options
+
+
+def normalize_status(termination_condition, local=False):
+    # a local solver's optimum, or that of a relaxation, can be fractional or infeasible for the exact model,
+    # so it goes through the checks of check_constraints as locallyOptimal
+    status = STATUS_MAP.get(termination_condition, termination_condition)
+    if local and status == TerminationCondition.optimal:
+        return TerminationCondition.locallyOptimal
+    return status
+
+
+def stopped_status(status, instance, objective_stop):
+    # a solve that reached objective_stop ends as 'other', with an incumbent at least that good; like the
+    # other limits it is taken as maxTimeLimit, whose incumbent model_executor validates
+    if status == TerminationCondition.other and objective_stop is not None:
+        objective = pyo.value(instance.OBJ, exception=False)
+        if objective is not None and objective <= objective_stop + 1e-9 * max(abs(objective_stop), 1):
+            return TerminationCondition.maxTimeLimit
+    return status
+
+
+def keep_snapshot(model, snapshot, telemetry=None):
+    # models are solved as built, without a create_instance() copy; a caller that needs the unsolved model,
+    # e.g. to solve it again with other options, passes a list to collect a copy in
+    if snapshot is not None:
+        with timed(telemetry, 'snapshot'):
+            snapshot.append(model.clone())
+
+
+def record_telemetry(telemetry, instance, results, solve_time, log_path, **stats):
+    # telemetry only observes a solve: statistics it cannot read are reported and left out, they never
+    # become the status of the solve
+    try:
+        stats.update(solve_stats(instance, results, solve_time, log_path))
+    except Exception as e:
+        print(f"no solver statistics: {e}")
+        stats['solve_time'] = solve_time
+    telemetry.record_solve(**stats)
+
+
+def solve_model(instance, solver_options=None, model_options=None, tee=None, warmstart=False, telemetry=None):
+    # tee defaults to the 'tee' solver option
+    tee = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}['tee'] if tee is None else tee
+    backend_name, options = native_options(solver_options, model_options)
+    backend = SOLVER_BACKENDS[backend_name]
+
+    # Gurobi also writes its log to a file, for the node count, gap and incumbents of the telemetry
+    log_path = None
+    if telemetry is not None and backend_name == 'gurobi':
+        handle, log_path = tempfile.mkstemp(suffix='.log')
+        os.close(handle)
+        options['LogFile'] = log_path
+
+    opt = pyo.SolverFactory(backend['solver'])
+    for key, value in options.items():
+        opt.options[key] = value
+
+    try:
+        if backend.get('relax'):
+            pyo.TransformationFactory('core.relax_integer_vars').apply_to(instance)
+
+        start = time.perf_counter()
+        with timed(telemetry, 'solve'):
+            # the values already on the instance are passed as a MIP start where the solver takes one
+            if warmstart and opt.warm_start_capable():
+                results = opt.solve(instance, tee=tee, load_solutions=False, warmstart=True)
+            else:
+                results = opt.solve(instance, tee=tee, load_solutions=False)
+        solve_time = time.perf_counter() - start
+        status = normalize_status(results.solver.termination_condition, backend.get('local', False))
+        if len(results.solution) > 0:
+            instance.solutions.load_from(results)
+
+        objective_stop = {**DEFAULT_SOLVER_OPTIONS, **(solver_options or {})}['objective_stop']
+        if len(results.solution) > 0:
+            status = stopped_status(status, instance, objective_stop)
+        if telemetry is not None:
+            record_telemetry(telemetry, instance, results, solve_time, log_path, backend=backend_name,
+                             status=str(status))
+
+        if status == TerminationCondition.infeasible:
+            print("------- INFEASIBLE --------")
+            return status
+
+        elif status != TerminationCondition.optimal:
+            print("non_optimal")
+
+        print(status)
+        print(results.solver.status)
+        print("==========================================")
+        return status
+
+    except Exception as e:
+        return e
+
+    finally:
+        if log_path is not None and os.path.exists(log_path):
+            os.remove(log_path)
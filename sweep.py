@@ -0,0 +1,116 @@
+import os
+import json
+import random
+import zlib
+from dataclasses import replace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from init_params import init_parameters
+from scenario_store import load_scenario, scenario_path
+from orchestrator import plan_threads, available_cores, race_size
+from run_options import RunOptions
+
+# environment variables read by the BLAS/OpenMP runtimes the solvers link against
+THREAD_LIMIT_VARIABLES = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+
+def job_seed(base_seed, load_ratio, iteration):
+    # stable across runs and processes, unlike hash()
+    return zlib.crc32(f'{base_seed}:{load_ratio}:{iteration}'.encode())
+
+
+def seed_generators(seed):
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def limit_worker_threads(threads):
+    for name in THREAD_LIMIT_VARIABLES:
+        os.environ[name] = str(threads)
+
+
+def read_progress(progress_path):
+    done = set()
+    if os.path.exists(progress_path):
+        with open(progress_path) as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    done.add((record['load_ratio'], record['iteration'], record['model']))
+    return done
+
+
+def record_progress(progress_path, load_ratio, iteration, model_name, seed):
+    with open(progress_path, 'a') as f:
+        f.write(json.dumps({'load_ratio': load_ratio, 'iteration': iteration, 'model': model_name,
+                            'seed': seed}) + '\n')
+
+
+def run_job(constant_params, tasks, model_name, model_path, iteration, seed, threads, config_params_path, options):
+    # imported here so that main.py can import this module without a cycle
+    from main import model_executor
+
+    seed_generators(seed)
+    solver_options = {**(options.solver_options or {}), 'threads': threads, 'seed': seed % 2**31}
+    model_executor(constant_params, tasks, model_name, model_path, iteration, config_params_path,
+                   replace(options, solver_options=solver_options))
+    return model_name
+
+
+def run_sweep(comp_load_ratio, iterations, config_params, config_params_path, model_path, params_path,
+              model_names=('BOS', 'ERAFL', 'RAFS', 'EOS'), workers=None, threads_per_worker=None, base_seed=0,
+              replay=False, options=None):
+    # replay reruns the models on the scenarios already stored under params_path instead of generating them;
+    # workers and threads_per_worker left None are planned from the core count and the largest scenario;
+    # options is the RunOptions of every job, the defaults when None
+    options = RunOptions() if options is None else options
+
+    # finished jobs are appended one per line, so an interrupted sweep resumes where it stopped
+    progress_path = os.path.join(model_path, 'sweep_progress.jsonl')
+    done = read_progress(progress_path)
+
+    cells = []
+    for load_ratio, load_cycles in comp_load_ratio.items():
+        for iteration in range(iterations):
+            pending = [name for name in model_names if (load_ratio, iteration, name) not in done]
+            if not pending:
+                continue
+
+            # the scenario is generated once in the parent so every model of a cell sees the same tasks,
+            # and the seed makes a resumed sweep regenerate exactly the same scenario
+            if replay:
+                constant_parameters, tasks, seed = load_scenario(scenario_path(params_path, load_ratio, iteration))
+                seed = job_seed(base_seed, load_ratio, iteration) if seed is None else seed
+            else:
+                seed = job_seed(base_seed, load_ratio, iteration)
+                seed_generators(seed)
+                constant_parameters, tasks = init_parameters(load_ratio, load_cycles, iteration, config_params,
+                                                             params_path, seed)
+            cells.append((load_ratio, iteration, seed, constant_parameters, tasks, pending))
+
+    # a racing job runs its configurations at once on its own threads, so fewer jobs fit on the cores
+    if threads_per_worker is None:
+        _, threads_per_worker = plan_threads(max((len(cell[4]) for cell in cells), default=0),
+                                             solves=race_size(model_names) if options.race else 1)
+    if workers is None:
+        workers = max(1, available_cores() // threads_per_worker)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=limit_worker_threads,
+                             initargs=(threads_per_worker,)) as pool:
+        jobs = dict()
+        for load_ratio, iteration, seed, constant_parameters, tasks, pending in cells:
+            model_output_path = os.path.join(model_path, f'{load_ratio}')
+            for model_name in pending:
+                job = pool.submit(run_job, constant_parameters, tasks, model_name, model_output_path,
+                                  iteration, seed, threads_per_worker, config_params_path, options)
+                jobs[job] = (load_ratio, iteration, model_name, seed)
+
+        for job in as_completed(jobs):
+            load_ratio, iteration, model_name, seed = jobs[job]
+            try:
+                job.result()
+            except Exception as e:
+                print(f'{model_name} load ratio {load_ratio} iteration {iteration} failed: {e}')
+                continue
+            record_progress(progress_path, load_ratio, iteration, model_name, seed)
+            print(f'{model_name} load ratio {load_ratio} iteration {iteration} done')
@@ -0,0 +1,56 @@
+import numpy as np
+
+# per-task columns: data size, time budget, computation per bit, epochs, model size, privacy score
+COLUMNS = ('D', 't', 'Z', 'e', 'M', 'P')
+
+
+class TaskTable:
+    # struct-of-arrays over all the tasks of a scenario, ids ascending. Dropping a task only clears its
+    # flag in the active mask, and copies share the column arrays and own nothing but the mask
+
+    def __init__(self, ids, D, t, Z, e, M, P, no_offloading=None, active=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.D = np.asarray(D, dtype=float)
+        self.t = np.asarray(t, dtype=float)
+        self.Z = np.asarray(Z, dtype=float)
+        self.e = np.asarray(e, dtype=float)
+        self.M = np.asarray(M, dtype=float)
+        self.P = np.asarray(P, dtype=float)
+        n = len(self.ids)
+        self.no_offloading = np.zeros(n, dtype=bool) if no_offloading is None else np.asarray(no_offloading)
+        self.active = np.ones(n, dtype=bool) if active is None else np.asarray(active)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active))
+
+    def copy(self):
+        return TaskTable(self.ids, self.D, self.t, self.Z, self.e, self.M, self.P, self.no_offloading,
+                         self.active.copy())
+
+    @property
+    def tasks_ids(self):
+        return self.ids[self.active].tolist()
+
+    def column(self, name):
+        return getattr(self, name)[self.active]
+
+    def as_dict(self, name):
+        # {task_id: value} of the active tasks, as Pyomo Params are initialized
+        return dict(zip(self.tasks_ids, self.column(name).tolist()))
+
+    def ids_where(self, mask):
+        return self.ids[self.active & mask].tolist()
+
+    def load(self):
+        # computational need D*Z*e of the active tasks
+        return self.column('D') * self.column('Z') * self.column('e')
+
+    def drop(self, task_ids):
+        self.active[np.searchsorted(self.ids, task_ids)] = False
+        return self
+
+    def keep(self, task_ids):
+        kept = self.copy()
+        kept.active[:] = False
+        kept.active[np.searchsorted(self.ids, task_ids)] = True
+        return kept
@@ -0,0 +1,96 @@
+import json
+import re
+import time
+from contextlib import contextmanager, nullcontext
+
+# lines of a Gurobi log the statistics are read from
+MODEL_SIZE_LINE = re.compile(r'Optimize a model with (\d+) rows, (\d+) columns and (\d+) nonzeros')
+NODES_LINE = re.compile(r'Explored (\d+) nodes')
+BEST_LINE = re.compile(r'Best objective ([-+\d.e]+|-), best bound ([-+\d.e]+|-), gap ([-+\d.e]+%|-)')
+START_LINE = re.compile(r'(?:Loaded user MIP start|Found heuristic solution):? (?:with )?objective ([-+\d.e]+)')
+
+
+class Telemetry:
+    # phase timings, solver statistics and drops of one model_executor run, written as one JSON line
+
+    def __init__(self, **fields):
+        self.fields = fields
+        self.phases = dict()
+        self.solves = []
+        self.drops = []
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+
+    def record_solve(self, **stats):
+        self.solves.append(stats)
+
+    def record_drop(self, attempt, task_ids):
+        self.drops.append({'attempt': attempt, 'task_ids': [int(task_id) for task_id in task_ids]})
+
+    def write(self, path, **fields):
+        record = {**self.fields, **fields, 'total_time': time.perf_counter() - self.start, 'phases': self.phases,
+                  'solves': self.solves, 'drops': self.drops}
+        # one write per run, so the lines of parallel sweep workers do not interleave
+        with open(path, 'a') as f:
+            f.write(json.dumps(record, default=str) + '\n')
+
+
+def solve_stats(instance, results, solve_time, log_path=None):
+    # solver_io is the part of the solve call spent outside the solver; a solver field the Pyomo interface
+    # does not report is left None
+    solver_time = getattr(results.solver, 'wallclock_time', None)
+    if not isinstance(solver_time, float):
+        solver_time = getattr(results.solver, 'time', None)
+        solver_time = solver_time if isinstance(solver_time, float) else None
+    stats = {'variables': instance.nvariables(), 'constraints': instance.nconstraints(), 'solve_time': solve_time,
+             'solver_time': solver_time, 'solver_io': None if solver_time is None else solve_time - solver_time}
+    if log_path is not None:
+        with open(log_path) as f:
+            stats.update(parse_gurobi_log(f.read()))
+    return stats
+
+
+def timed(telemetry, name):
+    return nullcontext() if telemetry is None else telemetry.phase(name)
+
+
+def number(text):
+    return None if text == '-' else float(text.rstrip('%'))
+
+
+def parse_gurobi_log(text):
+    # model size, node count, final gap and the incumbent timeline (seconds, objective) of a Gurobi log
+    stats = {'rows': None, 'columns': None, 'nonzeros': None, 'nodes': None, 'gap': None, 'incumbents': []}
+    for line in text.splitlines():
+        match = MODEL_SIZE_LINE.search(line)
+        if match:
+            stats['rows'], stats['columns'], stats['nonzeros'] = map(int, match.groups())
+            continue
+        match = START_LINE.search(line)
+        if match:
+            stats['incumbents'].append((0.0, float(match.group(1))))
+            continue
+        match = NODES_LINE.search(line)
+        if match:
+            stats['nodes'] = int(match.group(1))
+            continue
+        match = BEST_LINE.search(line)
+        if match:
+            gap = number(match.group(3))
+            stats['gap'] = None if gap is None else gap / 100
+            continue
+
+        # node log rows of a new incumbent start with H or *
+        tokens = line.split()
+        if tokens and tokens[0][0] in 'H*' and (tokens[0][1:] == '' or tokens[0][1:].isdigit()):
+            gaps = [k for k, token in enumerate(tokens) if token.endswith('%')]
+            if gaps and tokens[-1].endswith('s') and gaps[0] >= 2:
+                stats['incumbents'].append((float(tokens[-1][:-1]), float(tokens[gaps[0] - 2])))
+    return stats
@@ -0,0 +1,86 @@
+import os
+import subprocess
+import sys
+import pytest
+import pyomo.environ as pyo
+
+# the modules live at the root of the repository, next to this directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from main import read_simulation_config  # noqa: E402
+from benchmark import BENCHMARK_MODELS, benchmark_scenario  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def config_params():
+    return read_simulation_config(os.path.join(ROOT, 'simulation_config.txt'))
+
+
+@pytest.fixture
+def scenario(config_params):
+    # (constant_params, tasks) of n_tasks seeded tasks, with the budgets of the configuration
+    def make(n_tasks, seed):
+        return benchmark_scenario(config_params, n_tasks, seed)
+    return make
+
+
+@pytest.fixture(scope='session')
+def gurobi():
+    # the exact solves go through the default Gurobi backend of solvers.py
+    if not pyo.SolverFactory('gurobi').available(exception_flag=False):
+        pytest.skip('Gurobi is not available')
+
+
+# options and (n_tasks, seed) scenarios of the exact solves the other solution methods are checked against
+EXACT_OPTIONS = {'tee': False, 'time_limit': 30}
+EXACT_SCENARIOS = [(4, 0), (4, 2), (8, 3)]
+
+
+@pytest.fixture
+def exact_options():
+    return dict(EXACT_OPTIONS)
+
+
+@pytest.fixture(scope='session')
+def exact_optima():
+    # optima of the exact solves by (model_name, n_tasks, seed), shared by the tests of every method
+    return {}
+
+
+@pytest.fixture(params=EXACT_SCENARIOS, ids=lambda case: f'{case[0]}-{case[1]}')
+def exact_scenario(request, scenario, gurobi, exact_optima):
+    # (constant_params, tasks, optimum) of one of EXACT_SCENARIOS, where optimum(model_name) is the objective of
+    # the exact solve of that benchmark model, solved once per session
+    n_tasks, seed = request.param
+    constant_params, tasks = scenario(n_tasks, seed)
+
+    def optimum(model_name):
+        key = (model_name, n_tasks, seed)
+        if key not in exact_optima:
+            model, status = BENCHMARK_MODELS[model_name](constant_params, tasks, dict(EXACT_OPTIONS))
+            assert status == 'optimal'
+            exact_optima[key] = pyo.value(model.OBJ)
+        return exact_optima[key]
+    return constant_params, tasks, optimum
+
+
+# hides a package from the imports that follow, as on a machine without it
+WITHOUT_PACKAGE = """
+import sys
+class Hide:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == {package!r}:
+            raise ModuleNotFoundError(name=name)
+sys.meta_path.insert(0, Hide())
+"""
+
+
+@pytest.fixture(params=['gurobipy', 'scipy'])
+def without_gurobipy(request):
+    # runs code in a fresh interpreter at the root of the repository, with gurobipy hidden, or only the scipy
+    # its matrix API needs
+    def run(code):
+        return subprocess.run([sys.executable, '-c', WITHOUT_PACKAGE.format(package=request.param) + code],
+                              cwd=ROOT, capture_output=True, text=True, timeout=120)
+    return run
@@ -0,0 +1,49 @@
+import pytest
+import pyomo.environ as pyo
+from benchmark import BENCHMARK_MODELS, regressions, run_backends, run_benchmark, save_baseline
+
+
+def test_backends_agree_on_rafs(config_params, gurobi):
+    # HiGHS stands in for the non-Gurobi backends; RAFS is linear once its shares are fixed
+    if not pyo.SolverFactory('appsi_highs').available(exception_flag=False):
+        pytest.skip('HiGHS is not available')
+    highs, reference = run_backends(config_params, 'RAFS', n_tasks=4, backends=('highs', 'gurobi'),
+                                    solver_options={'time_limit': 30})
+    assert highs['backend'] == 'highs' and reference['backend'] == 'gurobi'
+    assert highs['status'] == reference['status'] == 'optimal'
+    assert highs['objective'] == pytest.approx(reference['objective'], rel=1e-6)
+
+
+def test_unavailable_backend_is_recorded(config_params):
+    records = run_backends(config_params, 'RAFS', n_tasks=4, backends=('scip',))
+    if records[0]['status'] != 'unavailable':
+        pytest.skip('SCIP is installed')
+    assert records == [{'backend': 'scip', 'status': 'unavailable'}]
+
+
+def test_failing_case_is_recorded_and_the_others_still_run(config_params, monkeypatch):
+    def too_large(constant_params, tasks, solver_options=None, telemetry=None):
+        raise RuntimeError('Model too large for size-limited license')
+    monkeypatch.setitem(BENCHMARK_MODELS, 'too_large', too_large)
+
+    records = run_benchmark(config_params, sizes=(4,), model_names=('too_large', 'EOS'))
+    assert [record['model'] for record in records] == ['too_large', 'EOS']
+    assert records[0]['status'] == 'Model too large for size-limited license'
+    assert records[0]['objective'] is None
+    assert records[1]['status'] == 'ok'
+
+
+def test_regressions_against_a_saved_baseline(tmp_path):
+    baseline = [{'model': 'ERAFL', 'tasks': 10, 'build_time': 1.0, 'solve_time': 2.0, 'peak_memory': 100,
+                 'objective': 10.0},
+                {'model': 'BOS', 'tasks': 10, 'build_time': 1.0, 'solve_time': 2.0, 'peak_memory': 100,
+                 'objective': None}]
+    path = str(tmp_path / 'baseline.json')
+    save_baseline(baseline, path)
+
+    # within the thresholds, past them, and a case the baseline does not have
+    records = [{**baseline[0], 'build_time': 1.4, 'solve_time': 3.5, 'objective': 10.05},
+               {**baseline[1], 'peak_memory': 200, 'objective': 5.0},
+               {**baseline[0], 'tasks': 100, 'build_time': 100.0}]
+    assert regressions(records, path) == [('ERAFL:10', 'solve_time', 2.0, 3.5), ('BOS:10', 'peak_memory', 100, 200)]
+    assert regressions(baseline, path) == []
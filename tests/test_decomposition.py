@@ -0,0 +1,17 @@
+from decomposition import erafl_decomposition
+from telemetry import Telemetry
+from validate_solution import check_constraints
+
+
+def test_decomposition_is_feasible_and_brackets_the_optimum(exact_scenario, exact_options):
+    constant_params, tasks, optimum = exact_scenario
+    best = optimum('ERAFL')
+    tolerance = 1e-4 * max(abs(best), 1)
+
+    telemetry = Telemetry()
+    solution, status = erafl_decomposition(constant_params, tasks, exact_options, telemetry=telemetry)
+    assert status in ('optimal', 'locallyOptimal')
+    assert check_constraints(solution, 'ERAFL', constant_params, tasks)
+    # the primal side is an admissible allocation, and the dual side prices budgets the optimum also meets
+    assert solution.objective >= best - tolerance
+    assert telemetry.solves[-1]['bound'] <= best + tolerance
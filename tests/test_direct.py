@@ -0,0 +1,24 @@
+import pytest
+from direct import DIRECT_MODELS
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_direct_build_matches_pyomo_build(exact_scenario, exact_options, model_name):
+    if not DIRECT_MODELS:
+        pytest.skip('gurobipy is not available')
+    constant_params, tasks, optimum = exact_scenario
+    solution, status = DIRECT_MODELS[model_name](constant_params, tasks, exact_options)
+
+    assert status == 'optimal'
+    assert solution.objective == pytest.approx(optimum(model_name), rel=1e-4, abs=1e-6)
+
+
+def test_models_run_without_gurobipy(without_gurobipy):
+    # the direct builds are left out and the Pyomo ones still run
+    result = without_gurobipy("""
+from direct import DIRECT_MODELS, conflicting_tasks
+import main
+print(len(DIRECT_MODELS), conflicting_tasks('ERAFL', None, None))
+""")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-2:] == ['0', '[]']
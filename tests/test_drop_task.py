@@ -0,0 +1,83 @@
+import os
+import numpy as np
+import pytest
+from direct import DIRECT_MODELS
+from drop_task import drop_batch, drop_iis, heaviest_task
+from main import model_executor
+from prescreen import prescreen
+from results import load_result
+from run_options import RunOptions
+from task_table import TaskTable
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_drop_iis_picks_the_conflicting_task(scenario, gurobi, model_name):
+    if not DIRECT_MODELS:
+        pytest.skip('gurobipy is not available')
+    # the lightest task gets a time budget no share can meet, so it alone is in conflict
+    constant_params, tasks = scenario(4, 0)
+    light = tasks.tasks_ids[int(np.argmin(tasks.load()))]
+    t = np.where(tasks.ids == light, 1e-9, tasks.t)
+    tasks = TaskTable(tasks.ids, tasks.D, t, tasks.Z, tasks.e, tasks.M, tasks.P, tasks.no_offloading)
+    assert heaviest_task(tasks) != light
+
+    assert drop_iis(tasks, None, constant_params, 0, model_name) == [light]
+
+
+def test_bisection_saves_infeasible_when_no_task_is_admitted(tmp_path, scenario, gurobi):
+    # budgets below the minimum shares reject every prefix, down to the lightest task alone
+    _, tasks = scenario(3, 0)
+    model_executor([1e-4, 1e-4, 1e-4], tasks, 'BOS', str(tmp_path), 0, None,
+                   RunOptions(solver_options={'tee': False, 'time_limit': 5}, drop_policy='bisection'))
+
+    solution, meta = load_result(os.path.join(tmp_path, 'BOS_0'))
+    assert meta['status'] == 'infeasible'
+    assert len(solution.ids) == 0
+    assert sorted(meta['dropped']) == sorted(tasks.tasks_ids)
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS', 'RAFS'])
+def test_first_batch_is_what_the_prescreen_drops(scenario, model_name):
+    # tight budgets, so the capacity bounds of every model leave some tasks out
+    constant_params, tasks = scenario(12, 0)
+    constant_params = [0.1 * budget for budget in constant_params]
+
+    assert sorted(drop_batch(tasks, None, constant_params, 0, model_name)) == \
+        sorted(prescreen(constant_params, tasks, model_name))
+
+
+@pytest.mark.parametrize('n_tasks, seed, scale', [(8, 3, 0.2), (12, 0, 0.1)])
+def test_batch_drops_back_off_to_the_single_drop_result(tmp_path, scenario, gurobi, n_tasks, seed, scale):
+    # the doubling batches overshoot here, and bisecting back within the last one takes the extra tasks back
+    constant_params, tasks = scenario(n_tasks, seed)
+    constant_params = [scale * budget for budget in constant_params]
+    admitted = dict()
+    for drop_policy in ('single', 'batch'):
+        path = os.path.join(tmp_path, drop_policy)
+        os.makedirs(path)
+        model_executor(constant_params, tasks, 'BOS', path, 0, None,
+                       RunOptions(solver_options={'tee': False, 'time_limit': 10}, drop_policy=drop_policy))
+        solution, meta = load_result(os.path.join(path, 'BOS_0'))
+        assert meta['status'] == 'optimal'
+        admitted[drop_policy] = solution.ids.tolist()
+
+    assert admitted['batch'] == admitted['single']
+
+
+def test_batch_bisects_back_when_it_drops_every_task(tmp_path):
+    if not DIRECT_MODELS:
+        pytest.skip('gurobipy is not available')
+    # the second batch doubles to both remaining tasks, although the lightest alone is admitted
+    tasks = TaskTable([1, 2, 3], [10, 10.1, 10.2], [10] * 3, [1e6] * 3, [1] * 3, [1] * 3, [1] * 3)
+    admitted = dict()
+    for drop_policy in ('single', 'bisection', 'batch'):
+        path = os.path.join(tmp_path, drop_policy)
+        os.makedirs(path)
+        model_executor([100, 2.0, 10], tasks, 'BOS', path, 0, None,
+                       RunOptions(solver_options={'tee': False, 'time_limit': 10}, drop_policy=drop_policy,
+                                  direct=True))
+        solution, meta = load_result(os.path.join(path, 'BOS_0'))
+        assert meta['status'] != 'infeasible'
+        admitted[drop_policy] = solution.ids.tolist()
+
+    assert admitted == {'single': [1], 'bisection': [1], 'batch': [1]}
@@ -0,0 +1,29 @@
+import pytest
+import pyomo.environ as pyo
+from benchmark import run_case, add_grid_error
+from ERAFL import erafl
+from validate_solution import check_constraints
+
+
+@pytest.mark.parametrize('seed', [0, 5])
+def test_conic_grid_approximation_is_never_below_bilinear_optimum(scenario, gurobi, exact_options, seed):
+    # three tasks keep the conic model within a size-limited Gurobi license
+    constant_params, tasks = scenario(3, seed)
+    exact, exact_status = erafl(constant_params, tasks, exact_options)
+    conic, conic_status = erafl(constant_params, tasks, exact_options, formulation='conic')
+    assert exact_status == conic_status == 'optimal'
+    assert check_constraints(conic, 'ERAFL', constant_params, tasks)
+
+    optimum = pyo.value(exact.OBJ)
+    assert pyo.value(conic.OBJ) >= optimum - 1e-4 * max(abs(optimum), 1)
+
+
+def test_benchmark_reports_grid_error(scenario, gurobi, exact_options):
+    constant_params, tasks = scenario(3, 5)
+    cases = [run_case(model_name, constant_params, tasks, exact_options) for model_name in ('ERAFL', 'ERAFL_conic')]
+    add_grid_error(cases)
+
+    exact, conic = cases
+    assert exact['grid_error'] is None
+    assert conic['grid_error'] == pytest.approx((conic['objective'] - exact['objective']) / exact['objective'])
+    assert conic['grid_error'] >= -1e-4
@@ -0,0 +1,19 @@
+import pytest
+from ERAS import eras, eras_closed_form
+
+
+def test_closed_form_matches_the_eras_solve(exact_scenario):
+    constant_params, tasks, optimum = exact_scenario
+    solution, status = eras_closed_form(constant_params, tasks)
+    assert status == 'optimal'
+
+    assert solution.objective == pytest.approx(optimum('RAFS'), rel=1e-4, abs=1e-6)
+    assert solution.ids.tolist() == tasks.tasks_ids
+
+
+def test_closed_form_is_infeasible_where_eras_is(scenario, gurobi, exact_options):
+    # budgets below the equal shares the tasks need
+    _, tasks = scenario(4, 0)
+    _, exact_status = eras([1e-4, 1e-4, 1e-4], tasks, exact_options)
+    _, status = eras_closed_form([1e-4, 1e-4, 1e-4], tasks)
+    assert exact_status == status == 'infeasible'
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+from EOS import eos
+from Evaluation import completion_times, result_metrics
+from solution import Solution
+
+
+def test_eos_slack_follows_its_own_completion_time(scenario):
+    constant_params, tasks = scenario(8, 2)
+    solution, status = eos(constant_params, tasks)
+    slack = tasks.column('t') - solution['t_c']
+
+    metrics = result_metrics(solution, {'solve_time': 0.0}, constant_params, tasks, 'EOS')
+    assert metrics['mean_slack'] == pytest.approx(slack.mean())
+    assert metrics['min_slack'] == pytest.approx(slack.min())
+
+    # a result saved without t_c is evaluated with the EOS formula, which has no upload
+    values = {name: column for name, column in solution.values.items() if name != 't_c'}
+    values['t_c'] = np.full(len(tasks), np.nan)
+    assert np.allclose(completion_times(Solution(solution.ids, values), tasks, 'EOS'), solution['t_c'])
@@ -0,0 +1,32 @@
+from heuristic import erafl_heuristic
+from validate_solution import check_constraints
+
+
+def test_heuristic_is_feasible_and_never_below_the_optimum(exact_scenario):
+    constant_params, tasks, optimum = exact_scenario
+    best = optimum('ERAFL')
+
+    solution, status = erafl_heuristic(constant_params, tasks)
+    assert status == 'locallyOptimal'
+    assert check_constraints(solution, 'ERAFL', constant_params, tasks)
+    assert solution.objective >= best - 1e-4 * max(abs(best), 1)
+
+
+def test_heuristic_without_allocation_reports_other(scenario):
+    # budgets below the minimum shares leave no allocation, for model_executor to drop tasks
+    _, tasks = scenario(3, 0)
+    solution, status = erafl_heuristic([1e-4, 1e-4, 1e-4], tasks)
+    assert status == 'other'
+    assert solution.objective is None
+
+
+def test_heuristic_needs_no_gurobipy(without_gurobipy):
+    result = without_gurobipy("""
+from benchmark import benchmark_scenario
+from heuristic import erafl_heuristic
+from main import read_simulation_config
+constant_params, tasks = benchmark_scenario(read_simulation_config('simulation_config.txt'), 4, 0)
+print(erafl_heuristic(constant_params, tasks)[1])
+""")
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split()[-1] == 'locallyOptimal'
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+import pyomo.environ as pyo
+from pyomo.core.expr.visitor import identify_variables
+from BOS_model import bos_model
+from ERAFL import erafl
+from incremental import open_persistent, release_task, resolve
+
+
+@pytest.mark.parametrize('model_name, rebuild', [('ERAFL', erafl), ('BOS', bos_model)])
+def test_release_task_matches_a_rebuild(scenario, gurobi, model_name, rebuild):
+    constant_params, tasks = scenario(4, 0)
+    solver_options = {'tee': False, 'time_limit': 30}
+    model, opt = open_persistent(model_name, constant_params, tasks, solver_options)
+    resolve(model, opt, False)
+    n_vars = opt.get_model_attr('NumVars')
+
+    released = tasks.tasks_ids[int(np.argmin(tasks.load()))]
+    release_task(model, opt, released)
+    model, status = resolve(model, opt, False)
+
+    # the task leaves the budgets and the solver instead of being pinned below its bounds
+    assert all(var.index() != released for var in identify_variables(model.Constraint1.body))
+    assert opt.get_model_attr('NumVars') == n_vars - len(list(model.component_objects(pyo.Var)))
+
+    expected, expected_status = rebuild(constant_params, tasks.copy().drop([released]), solver_options)
+    assert status == expected_status == 'optimal'
+    assert pyo.value(model.OBJ) == pytest.approx(pyo.value(expected.OBJ), rel=1e-4)
+
+
+def test_resolve_stops_at_objective_stop_and_clears_it(scenario, gurobi):
+    constant_params, tasks = scenario(4, 0)
+    model, opt = open_persistent('BOS', constant_params, tasks, {'tee': False, 'time_limit': 30})
+
+    # every incumbent is within a stop this high, so the first one ends the solve
+    _, status = resolve(model, opt, False, objective_stop=1e12)
+    assert status == 'maxTimeLimit'
+    _, status = resolve(model, opt, False)
+    assert status == 'optimal'
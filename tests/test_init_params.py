@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from init_params import PRIVACY_SCORES, logspace_boundaries, task_generator
+from sweep import seed_generators
+
+
+def generate(config_params, seed, load_budget, **kwargs):
+    seed_generators(seed)
+    return task_generator(config_params, load_budget, **kwargs)
+
+
+@pytest.mark.parametrize('n_tasks', [None, 40])
+def test_task_generator_is_reproducible_with_a_seed(config_params, n_tasks):
+    load_budget = config_params['comp_rsc'] * 300
+    first = generate(config_params, 7, load_budget, n_tasks=n_tasks)
+    again = generate(config_params, 7, load_budget, n_tasks=n_tasks)
+    other = generate(config_params, 8, load_budget, n_tasks=n_tasks)
+
+    assert all(np.array_equal(column, column_again) for column, column_again in zip(first, again))
+    assert not np.array_equal(first[0], other[0])
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_task_generator_values_are_in_range(config_params, seed):
+    load_budget = config_params['comp_rsc'] * 300
+    data_size, model_size, epoch_number, computation_per_bit, privacy_scores = \
+        generate(config_params, seed, load_budget, block_size=16)
+    load = data_size * epoch_number * computation_per_bit
+
+    # the last boundary is the first one at or past the configured upper bound
+    data_boundaries = logspace_boundaries(config_params['data_size_l'], config_params['data_size_u'])
+    model_boundaries = logspace_boundaries(config_params['model_size_l'], config_params['model_size_u'])
+    assert np.all((data_size >= config_params['data_size_l']) & (data_size <= data_boundaries[-1]))
+    assert np.all((model_size >= config_params['model_size_l']) & (model_size <= model_boundaries[-1]))
+    assert np.all((epoch_number >= config_params['epoch_l']) & (epoch_number < config_params['epoch_u']))
+    assert np.array_equal(computation_per_bit, ((500 / 40) * model_size).astype(int))
+    assert np.isin(privacy_scores, PRIVACY_SCORES).all()
+
+    # every task fits the budget alone, and only the last one takes the total past it
+    assert np.all(load < load_budget)
+    assert load.sum() > load_budget >= load[:-1].sum()
+
+
+def test_task_generator_draws_exactly_n_tasks(config_params):
+    # a small load budget rejects most candidates, so more than one block is drawn
+    load_budget = config_params['comp_rsc'] * 5
+    columns = generate(config_params, 3, load_budget, block_size=4, n_tasks=50)
+
+    assert all(len(column) == 50 for column in columns)
+    data_size, _, epoch_number, computation_per_bit, _ = columns
+    assert np.all(data_size * epoch_number * computation_per_bit < load_budget)
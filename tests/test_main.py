@@ -0,0 +1,99 @@
+import json
+import os
+import numpy as np
+import pytest
+from EOS import eos
+from main import model_executor
+from results import load_result
+from run_options import RunOptions
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_model_executor_keeps_incumbent_with_telemetry(tmp_path, scenario, gurobi, model_name):
+    # model_executor always records telemetry; on the default gurobi backend that must not turn a solve with
+    # a valid incumbent into a failure, and so into dropped tasks
+    constant_params, tasks = scenario(8, 2)
+    model_executor(constant_params, tasks, model_name, str(tmp_path), 0, None,
+                   RunOptions(solver_options={'tee': False, 'time_limit': 5}))
+
+    solution, meta = load_result(os.path.join(tmp_path, f'{model_name}_0'))
+    assert meta['status'] in ('optimal', 'maxTimeLimit', 'locallyOptimal')
+    assert meta['dropped'] == []
+    assert len(solution.ids) == len(tasks)
+
+    with open(os.path.join(tmp_path, 'telemetry.jsonl')) as f:
+        record = json.loads(f.readline())
+    assert [solve['status'] for solve in record['solves']] == [meta['status']]
+    assert record['solves'][0]['solver_time'] is None or record['solves'][0]['solver_time'] >= 0
+
+
+def test_model_executor_saves_empty_result_when_every_task_is_dropped(tmp_path, scenario, gurobi):
+    # budgets below the minimum shares leave every solve infeasible, so the drop loop ends with no task
+    _, tasks = scenario(3, 0)
+    model_executor([1e-4, 1e-4, 1e-4], tasks, 'ERAFL', str(tmp_path), 0, None,
+                   RunOptions(solver_options={'tee': False, 'time_limit': 5}, screen=False))
+
+    solution, meta = load_result(os.path.join(tmp_path, 'ERAFL_0'))
+    assert meta['status'] == 'infeasible'
+    assert len(solution.ids) == 0
+    assert sorted(meta['dropped']) == sorted(tasks.tasks_ids)
+
+
+def test_model_executor_saves_eos_baseline(tmp_path, scenario):
+    # EOS solves nothing, so every task is kept whatever its completion time
+    constant_params, tasks = scenario(8, 2)
+    model_executor(constant_params, tasks, 'EOS', str(tmp_path), 0, None, RunOptions(screen=True))
+
+    solution, meta = load_result(os.path.join(tmp_path, 'EOS_0'))
+    assert meta['status'] == 'ok'
+    assert solution.ids.tolist() == tasks.tasks_ids
+    assert solution.objective == 0.0
+
+    # its completion times are saved with the allocation, and the misses are the tasks past their time budget
+    expected, _ = eos(constant_params, tasks)
+    assert np.allclose(solution['t_c'], expected['t_c'])
+    assert np.array_equal(solution['missed'] == 1, solution['t_c'] > tasks.column('t'))
+
+
+def test_model_executor_races_only_the_exact_formulation(tmp_path, scenario):
+    # the raced configurations solve the bilinear ERAFL, so racing leaves an approximate formulation as asked
+    constant_params, tasks = scenario(8, 2)
+    model_executor(constant_params, tasks, 'ERAFL', str(tmp_path), 0, None,
+                   RunOptions(formulation='heuristic', race=True))
+
+    with open(os.path.join(tmp_path, 'telemetry.jsonl')) as f:
+        record = json.loads(f.readline())
+    assert record['solves'] and {solve['backend'] for solve in record['solves']} == {'heuristic'}
+
+
+def test_model_executor_saves_empty_result_when_the_prescreen_drops_every_task(tmp_path, scenario):
+    # no live model is opened over no tasks; the run ends as it does without persistent
+    _, tasks = scenario(3, 0)
+    model_executor([1e-4, 1e-4, 1e-4], tasks, 'BOS', str(tmp_path), 0, None,
+                   RunOptions(solver_options={'tee': False, 'time_limit': 5}, screen=True, persistent=True))
+
+    solution, meta = load_result(os.path.join(tmp_path, 'BOS_0'))
+    assert meta['status'] == 'infeasible'
+    assert len(solution.ids) == 0
+    assert sorted(meta['dropped']) == sorted(tasks.tasks_ids)
+
+
+def test_model_executor_applies_gap_tolerance_to_the_persistent_model(tmp_path, scenario, gurobi):
+    # a tolerance this loose accepts the first incumbent, so the live model stops there as well
+    constant_params, tasks = scenario(8, 2)
+    model_executor(constant_params, tasks, 'BOS', str(tmp_path), 0, None,
+                   RunOptions(solver_options={'tee': False, 'time_limit': 30}, persistent=True, gap_tolerance=1e6))
+
+    solution, meta = load_result(os.path.join(tmp_path, 'BOS_0'))
+    with open(os.path.join(tmp_path, 'telemetry.jsonl')) as f:
+        record = json.loads(f.readline())
+    assert [solve['backend'] for solve in record['solves']] == ['gurobi_persistent']
+    assert meta['status'] == record['solves'][0]['status'] == 'maxTimeLimit'
+    assert meta['gap'] <= 1e6
+
+
+def test_model_executor_rejects_a_relaxed_backend(tmp_path, scenario):
+    constant_params, tasks = scenario(4, 0)
+    with pytest.raises(ValueError):
+        model_executor(constant_params, tasks, 'BOS', str(tmp_path), 0, None,
+                       RunOptions(solver_options={'backend': 'ipopt'}))
@@ -0,0 +1,59 @@
+import numpy as np
+from heuristic import erafl_heuristic
+from online import OnlineAdmission, arrival_times, simulate
+
+
+def stream(config_params, scenario, n_tasks=60, seed=1):
+    # the configured budgets, which a stream of tasks shares over time
+    _, tasks = scenario(n_tasks, seed)
+    return [config_params['bandwidth'], config_params['backhaul'], config_params['comp_rsc']], tasks
+
+
+def test_arrival_is_admitted_within_the_free_budgets_and_released_on_departure(config_params, scenario):
+    constant_params, tasks = stream(config_params, scenario)
+    hub = OnlineAdmission(constant_params, tasks, solver=erafl_heuristic)
+
+    assert hub.arrive(0, now=0.0)
+    assert np.all(hub.free() >= 0) and np.all(hub.free() < constant_params)
+    assert hub.tasks.tasks_ids == [tasks.ids[0]]
+
+    hub.depart(now=tasks.t[0])
+    assert np.allclose(hub.free(), constant_params)
+    assert len(hub.tasks) == 0
+
+
+def test_arrival_is_rejected_without_free_budget(scenario):
+    _, tasks = scenario(4, 0)
+    hub = OnlineAdmission([1e-4, 1e-4, 1e-4], tasks, solver=erafl_heuristic)
+
+    assert not hub.arrive(0, now=0.0)
+    assert hub.stats == {'admitted': 0, 'rejected': 1, 'resolves_started': 0, 'resolves_applied': 0}
+    assert np.isnan(hub.allocation['B']).all()
+
+
+def test_resolve_is_applied_at_its_simulated_completion(config_params, scenario):
+    constant_params, tasks = stream(config_params, scenario)
+    hub = OnlineAdmission(constant_params, tasks, solver=erafl_heuristic, resolve_interval=10, resolve_latency=5)
+    for row in range(3):
+        hub.arrive(row, now=float(row))
+
+    hub.maybe_resolve(now=10.0)
+    assert hub.stats['resolves_started'] == 1
+    hub.apply_resolve(now=14.0)
+    assert hub.pending is not None and hub.stats['resolves_applied'] == 0
+    hub.apply_resolve(now=15.0)
+    assert hub.pending is None and hub.stats['resolves_applied'] == 1
+    hub.pool.shutdown()
+
+
+def test_resolves_are_applied_while_the_stream_runs(config_params, scenario):
+    constant_params, tasks = stream(config_params, scenario)
+    np.random.seed(0)
+    metrics = simulate(constant_params, tasks, arrival_times(len(tasks.ids), rate=0.05), solver=erafl_heuristic,
+                       resolve_interval=100, resolve_latency=20)
+
+    # a new re-solve only starts once the previous one was applied or discarded, so several starts mean the
+    # earlier ones finished during the stream rather than at its end
+    assert metrics['resolves_started'] > 2
+    assert metrics['resolves_applied'] > 1
+    assert metrics['admitted'] + metrics['rejected'] == len(tasks.ids)
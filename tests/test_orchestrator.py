@@ -0,0 +1,61 @@
+import os
+import subprocess
+import time
+import numpy as np
+from pyomo.opt import TerminationCondition
+from orchestrator import plan_threads, race, race_options
+from solution import Solution
+
+
+def test_plan_threads_budgets_the_solves_of_a_race():
+    assert plan_threads(10, cores=8) == (8, 1)
+    assert plan_threads(10, cores=8, solves=3) == (2, 3)
+    assert plan_threads(100000, cores=8, solves=3) == (1, 8)
+
+
+def test_race_options_merge_native_options_key_by_key():
+    settings = {'time_limit': 60, 'threads': 8, 'native': {'Presolve': 0, 'Seed': 1}}
+    options = race_options(settings, {'native': {'Presolve': -1}}, 2)
+
+    assert options == {'time_limit': 60, 'threads': 2, 'native': {'Presolve': -1, 'Seed': 1}}
+    assert settings['native'] == {'Presolve': 0, 'Seed': 1}
+
+
+def wins_once_loser_runs(constant_params, tasks, solver_options):
+    while not os.path.exists(solver_options['pid_path']):
+        time.sleep(0.05)
+    n = len(tasks)
+    return Solution(tasks.tasks_ids, {'D_o': np.zeros(n)}, 0.0), TerminationCondition.optimal
+
+
+def loses_with_solver_process(constant_params, tasks, solver_options):
+    # stands for a solver run as a shell command, which outlives a plain terminate() of its parent
+    solver = subprocess.Popen(['sleep', '60'])
+    with open(solver_options['pid_path'], 'w') as f:
+        f.write(str(solver.pid))
+    solver.wait()
+
+
+def running(pid):
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            # the state follows the parenthesized command name; an unreaped zombie no longer runs
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+
+def test_race_stops_the_solver_processes_of_lost_solves(tmp_path, scenario):
+    constant_params, tasks = scenario(4, 0)
+    pid_path = str(tmp_path / 'solver.pid')
+    configurations = [('winner', wins_once_loser_runs, {}), ('loser', loses_with_solver_process, {})]
+    solution, status = race(constant_params, tasks, {'pid_path': pid_path, 'time_limit': 5}, 'ERAFL',
+                            configurations, cores=2)
+
+    assert status == 'optimal'
+    with open(pid_path) as f:
+        pid = int(f.read())
+    deadline = time.time() + 5
+    while running(pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not running(pid)
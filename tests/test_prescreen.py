@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from benchmark import BENCHMARK_MODELS
+from prescreen import alone_feasible, prescreen
+from task_table import TaskTable
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_prescreen_keeps_a_solvable_set(exact_scenario, model_name):
+    # every task of these scenarios is admitted by the exact solve, so the capacity bounds pass them all
+    constant_params, tasks, optimum = exact_scenario
+    optimum(model_name)
+
+    assert prescreen(constant_params, tasks, model_name) == []
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_prescreen_drops_only_tasks_no_solve_admits(scenario, gurobi, exact_options, model_name):
+    # tight budgets, so the capacity bounds leave some tasks out, and the lightest task misses its time budget
+    # even alone
+    constant_params, tasks = scenario(12, 0)
+    constant_params = [0.1 * budget for budget in constant_params]
+    light = tasks.tasks_ids[int(np.argmin(tasks.load()))]
+    t = np.where(tasks.ids == light, 1e-9, tasks.t)
+    tasks = TaskTable(tasks.ids, tasks.D, t, tasks.Z, tasks.e, tasks.M, tasks.P, tasks.no_offloading)
+
+    dropped = prescreen(constant_params, tasks, model_name)
+    alone = alone_feasible(constant_params, tasks.D, tasks.t, tasks.M)
+    assert not alone[tasks.ids == light].any()
+
+    # a task that fails alone_feasible is infeasible even with every budget to itself
+    for task_id in tasks.ids[~alone].tolist():
+        assert task_id in dropped
+        _, status = BENCHMARK_MODELS[model_name](constant_params, tasks.keep([task_id]), exact_options)
+        assert status == 'infeasible'
+
+    # the kept tasks together with the lightest one past the capacity bounds cannot all be admitted
+    beyond = [task_id for task_id in dropped if alone[tasks.ids == task_id].all()]
+    assert beyond
+    kept = [task_id for task_id in tasks.tasks_ids if task_id not in dropped]
+    lightest = min(beyond, key=lambda task_id: tasks.keep([task_id]).load()[0])
+    _, status = BENCHMARK_MODELS[model_name](constant_params, tasks.keep(sorted(kept + [lightest])), exact_options)
+    assert status == 'infeasible'
@@ -0,0 +1,17 @@
+import pytest
+from relaxation import relaxation_bound, optimality_gap
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_relaxation_bound_is_below_the_optimum(exact_scenario, model_name):
+    constant_params, tasks, optimum = exact_scenario
+    best = optimum(model_name)
+
+    bound = relaxation_bound(constant_params, tasks, model_name)
+    assert 0 <= bound <= best + 1e-4 * max(abs(best), 1)
+    assert 0 <= optimality_gap(best, bound) <= 1
+
+
+def test_relaxation_bound_of_no_task_is_zero(scenario):
+    constant_params, tasks = scenario(4, 0)
+    assert relaxation_bound(constant_params, tasks.keep([]), 'ERAFL') == 0.0
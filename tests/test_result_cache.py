@@ -0,0 +1,26 @@
+import json
+from main import model_executor
+from result_cache import cache_key
+from run_options import RunOptions
+from solution import Solution
+
+
+def test_cache_key_ignores_threads(scenario):
+    constant_params, tasks = scenario(8, 0)
+    keys = {cache_key(constant_params, tasks, 'ERAFL', None, {'threads': threads, 'tee': tee})
+            for threads in (1, 4) for tee in (False, True)}
+    assert len(keys) == 1
+    assert cache_key(constant_params, tasks, 'ERAFL', None, {'time_limit': 5}) not in keys
+
+
+def test_model_executor_returns_solution_on_hit_and_miss(tmp_path, scenario):
+    constant_params, tasks = scenario(8, 0)
+    options = RunOptions(formulation='heuristic', cache_path=str(tmp_path / 'cache'))
+    solved = model_executor(constant_params, tasks, 'ERAFL', str(tmp_path), 0, None, options)
+    cached = model_executor(constant_params, tasks, 'ERAFL', str(tmp_path), 1, None, options)
+
+    with open(tmp_path / 'telemetry.jsonl') as f:
+        assert [json.loads(line).get('cached') for line in f] == [None, True]
+    assert isinstance(solved, Solution) and isinstance(cached, Solution)
+    assert cached.ids.tolist() == solved.ids.tolist()
+    assert cached.objective == solved.objective
@@ -0,0 +1,26 @@
+import os
+import numpy as np
+from results import RESULT_COLUMNS, RESULT_DTYPE, load_result, result_paths, save_result
+from solution import Solution
+
+
+def test_result_round_trip_by_column(tmp_path):
+    values = {'B': np.array([1.0, 2.0]), 'bB': np.array([3.0, 4.0]), 'D_o': np.array([0.0, 5.0])}
+    path = os.path.join(tmp_path, 'ERAFL_0')
+    save_result(path, Solution([3, 7], values, 5.0), 'optimal', 0.5, [1], bound=4.0, gap=0.2)
+
+    assert np.load(f'{path}.npy').dtype == RESULT_DTYPE
+
+    solution, meta = load_result(path)
+    assert isinstance(solution['B'], np.memmap)
+    assert solution.ids.tolist() == [3, 7]
+    for name in RESULT_COLUMNS:
+        expected = values.get(name, np.full(2, np.nan))
+        assert np.array_equal(solution[name], expected, equal_nan=True)
+    assert meta == {'objective': 5.0, 'status': 'optimal', 'solve_time': 0.5, 'dropped': [1], 'bound': 4.0,
+                    'gap': 0.2}
+
+    # only the columns asked for are read
+    solution, _ = load_result(path, ('D_o',))
+    assert list(solution.values) == ['D_o']
+    assert result_paths(str(tmp_path)) == [path]
@@ -0,0 +1,36 @@
+import os
+import numpy as np
+from results import RESULT_COLUMNS, load_result
+from scenario_store import load_scenario, scenario_path
+from sweep import run_sweep
+
+MODEL_NAMES = ('RAFS', 'EOS')
+
+
+def sweep(config_params, root, replay=False, params_path=None):
+    model_path = os.path.join(root, 'models')
+    params_path = params_path or os.path.join(root, 'params')
+    for path in (os.path.join(model_path, '30'), os.path.join(params_path, '30')):
+        os.makedirs(path, exist_ok=True)
+    run_sweep({'30': 5}, 2, config_params, None, model_path, params_path, MODEL_NAMES, workers=1,
+              threads_per_worker=1, replay=replay)
+    return model_path, params_path
+
+
+def test_replayed_scenarios_give_identical_results(tmp_path, config_params):
+    model_path, params_path = sweep(config_params, os.path.join(tmp_path, 'generated'))
+    replay_path, _ = sweep(config_params, os.path.join(tmp_path, 'replayed'), replay=True, params_path=params_path)
+
+    for iteration in range(2):
+        constant_params, tasks, seed = load_scenario(scenario_path(params_path, '30', iteration))
+        assert seed is not None and len(tasks) > 0
+        for model_name in MODEL_NAMES:
+            solution, meta = load_result(os.path.join(model_path, '30', f'{model_name}_{iteration}'))
+            replayed, replayed_meta = load_result(os.path.join(replay_path, '30', f'{model_name}_{iteration}'))
+
+            assert meta['status'] == replayed_meta['status']
+            assert meta['dropped'] == replayed_meta['dropped']
+            assert np.array_equal(solution.ids, replayed.ids)
+            assert solution.objective == replayed.objective
+            for name in RESULT_COLUMNS:
+                assert np.array_equal(solution[name], replayed[name], equal_nan=True)
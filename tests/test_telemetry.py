@@ -0,0 +1,59 @@
+import json
+import os
+from main import model_executor
+from run_options import RunOptions
+from telemetry import Telemetry
+
+# fields every record of telemetry.jsonl has, whatever the run
+RECORD_FIELDS = {'total_time', 'phases', 'solves', 'drops'}
+# fields model_executor adds to the record of a solved run
+RUN_FIELDS = {'model', 'model_path', 'iteration', 'tasks', 'status', 'admitted', 'objective', 'bound', 'gap'}
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_telemetry_writes_one_record_per_run(tmp_path):
+    path = os.path.join(tmp_path, 'telemetry.jsonl')
+    for run in range(2):
+        telemetry = Telemetry(model='ERAFL', run=run)
+        with telemetry.phase('solve'):
+            telemetry.record_solve(backend='gurobi', status='optimal', solve_time=0.5)
+        with telemetry.phase('solve'):
+            pass
+        telemetry.record_drop(0, [3, 1])
+        telemetry.write(path, status='optimal')
+
+    records = read_records(path)
+    assert [record['run'] for record in records] == [0, 1]
+    for record in records:
+        assert RECORD_FIELDS | {'model', 'run', 'status'} <= set(record)
+        assert record['total_time'] >= record['phases']['solve'] >= 0
+        assert record['solves'] == [{'backend': 'gurobi', 'status': 'optimal', 'solve_time': 0.5}]
+        assert record['drops'] == [{'attempt': 0, 'task_ids': [3, 1]}]
+
+
+def test_model_executor_telemetry_records_solves_and_drops(tmp_path, scenario, gurobi):
+    # budgets tight enough that tasks are dropped before a solve is accepted
+    constant_params, tasks = scenario(8, 3)
+    constant_params = [0.2 * budget for budget in constant_params]
+    options = RunOptions(solver_options={'tee': False, 'time_limit': 10})
+    model_executor(constant_params, tasks, 'BOS', str(tmp_path), 0, None, options)
+
+    record, = read_records(os.path.join(tmp_path, 'telemetry.jsonl'))
+    assert RECORD_FIELDS | RUN_FIELDS | set(options.settings()) <= set(record)
+    assert record['model'] == 'BOS' and record['tasks'] == len(tasks) and record['status'] == 'optimal'
+    assert {'build', 'solve', 'validate', 'drop', 'save'} <= set(record['phases'])
+
+    # one solve per drop attempt and one more for the accepted one
+    assert len(record['drops']) > 0
+    assert len(record['solves']) == len(record['drops']) + 1
+    for solve in record['solves']:
+        assert {'backend', 'status', 'solve_time', 'variables', 'constraints'} <= set(solve)
+    assert [solve['status'] for solve in record['solves']][-1] == 'optimal'
+
+    dropped = [task_id for drop in record['drops'] for task_id in drop['task_ids']]
+    assert record['admitted'] == len(tasks) - len(dropped)
+    assert [drop['attempt'] for drop in record['drops']] == list(range(len(record['drops'])))
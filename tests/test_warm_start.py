@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+from task_table import TaskTable
+from warm_start import heuristic_start
+
+
+@pytest.mark.parametrize('model_name', ['ERAFL', 'BOS'])
+def test_heuristic_start_meets_both_time_budgets(model_name):
+    # task 0 must offload nearly all its data and task 1 computes locally, so a split of the backhaul by
+    # demand leaves task 0 too little to send its offloaded data in time
+    tasks = TaskTable([0, 1], D=[100, 100], t=[20, 20], Z=[1e6, 1], e=[1, 1], M=[0, 0], P=[1, 10])
+    constant_params = [150, 7, 100]
+    B, bB, F, D_o = heuristic_start(constant_params, tasks, model_name)
+    D, t, Z, e, M = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M'))
+
+    assert D_o[0] > 0.9 * D[0]
+    assert np.all(D / B + D_o / bB <= t * (1 + 1e-9))
+    assert np.all(D / B + e * Z * (D - D_o) / F + M / bB <= t * (1 + 1e-9))
+    assert bB.sum() <= constant_params[1] * (1 + 1e-9)
@@ -0,0 +1,64 @@
+import numpy as np
+from prescreen import MINIMUM_SHARE
+from solution import Solution, RESULT_VARS
+
+# reciprocal auxiliaries of the shares, in the models that have them
+AUXILIARIES = {'b': 'B', 'bb': 'bB', 'f': 'F'}
+
+
+def relative(excess, scale):
+    # violation of lhs <= rhs as (lhs - rhs) / max(1, |rhs|), 0 where it holds
+    return np.maximum(excess, 0) / np.maximum(1, np.abs(scale))
+
+
+def constraint_violations(solution, tasks, constant_params, model_name):
+    # {constraint: relative violations}, per task except for the budgets; tasks is aligned to solution.ids
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    rows = np.searchsorted(tasks.ids, solution.ids)
+    D, t, Z, e, M = (getattr(tasks, name)[rows] for name in ('D', 't', 'Z', 'e', 'M'))
+    B, bB, F, alpha, D_o = (np.asarray(solution[name]) for name in ('B', 'bB', 'F', 'alpha', 'D_o'))
+
+    violations = {
+        'bandwidth': relative(np.array([B.sum() - bandwidth_budget]), bandwidth_budget),
+        'backhaul_bandwidth': relative(np.array([bB.sum() - backhaul_bandwidth_budget]), backhaul_bandwidth_budget),
+        'frequency': relative(np.array([F.sum() - cpu_cycle_frequency]), cpu_cycle_frequency),
+        'minimum_share': relative(MINIMUM_SHARE[model_name] - np.minimum(np.minimum(B, bB), F),
+                                  MINIMUM_SHARE[model_name]),
+        # the physical times, with 1/B etc. rather than the auxiliaries
+        'time_budget1': relative(D / B + e * (D - D_o) * Z / F + M / bB - t, t),
+        'time_budget2': relative(D / B + D_o / bB - t, t),
+    }
+
+    # one-sided, as the conic ERAFL only keeps b >= 1/B; an auxiliary below the reciprocal is what would
+    # let the model's own time budgets undercount
+    for auxiliary, share in AUXILIARIES.items():
+        if auxiliary in solution.values:
+            violations[f'{auxiliary}_auxiliary'] = relative(1 - solution[auxiliary] * solution[share], 1)
+
+    if model_name == 'ERAFL':
+        b1, b2 = np.asarray(solution['b1']), np.asarray(solution['b2'])
+        violations['converted3'] = relative(b1 + b2 - 1, 1)
+        violations['alpha_range'] = relative(np.maximum(0.3 - alpha, alpha - 0.7), 0.7)
+        violations['integrality'] = np.maximum(np.abs(b1 - np.round(b1)), np.abs(b2 - np.round(b2)))
+        violations['offloaded_data'] = relative(np.abs(D_o - np.round(b1) * alpha * D - np.round(b2) * D), D)
+    else:
+        violations['offloaded_data'] = relative(np.abs(D_o - alpha * D), D)
+        if model_name == 'BOS':
+            violations['integrality'] = np.abs(alpha - np.round(alpha))
+
+    return violations
+
+
+def check_constraints(model, model_name, constant_params, tasks, tolerance=1e-6):
+    # whether the incumbent of a timed-out or locally optimal solve satisfies every constraint
+    solution = model if isinstance(model, Solution) else \
+        Solution.from_instance(model, tasks.tasks_ids, RESULT_VARS + tuple(AUXILIARIES))
+
+    violated = False
+    for name, violation in constraint_violations(solution, tasks, constant_params, model_name).items():
+        # NaN means a variable was left without a value
+        worst = np.max(np.nan_to_num(violation, nan=np.inf), initial=0)
+        if worst > tolerance:
+            print(f"constraint {name} violated by {worst:.3g}")
+            violated = True
+    return not violated
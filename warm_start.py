@@ -0,0 +1,126 @@
+import numpy as np
+from prescreen import MINIMUM_SHARE, OFFLOADING_LEVELS
+
+
+def proportional_shares(budget, demand, minimum_share):
+    # every share gets the model's lower bound and what is left of the budget goes in proportion to demand
+    left = max(budget - minimum_share * len(demand), 0)
+    return minimum_share + left * demand / max(demand.sum(), 1e-12)
+
+
+def heuristic_start(constant_params, tasks, model_name):
+    # per active task: B, bB, F and the offloaded data D_o of a cheap assignment. Bandwidth and backhaul are
+    # split by demand, then the CPU goes greedily to the tasks that are costliest to offload, and the rest
+    # offload as little as the CPU left to them allows
+    bandwidth_budget, backhaul_bandwidth_budget, cpu_cycle_frequency = constant_params
+    minimum_share = MINIMUM_SHARE[model_name]
+    D, t, Z, e, M, P = (tasks.column(name) for name in ('D', 't', 'Z', 'e', 'M', 'P'))
+    no_offloading = tasks.no_offloading[tasks.active]
+
+    B = proportional_shares(bandwidth_budget, D / t, minimum_share)
+    bB = proportional_shares(backhaul_bandwidth_budget, (D + M) / t, minimum_share)
+
+    # time left for local computation after the upload and the model transfer of time_budget1
+    slack = t - D / B - M / bB
+    local_need = np.where(slack > 0, e * Z * D / np.maximum(slack, 1e-12), np.inf)
+
+    # tasks that may not offload go first, then the highest privacy cost
+    order = np.lexsort((-P * D, ~no_offloading))
+    granted = np.zeros(len(D), dtype=bool)
+    granted[order] = np.cumsum(np.maximum(local_need[order], minimum_share)) <= cpu_cycle_frequency
+    granted |= no_offloading
+
+    F = np.full(len(D), float(minimum_share))
+    F[granted] = np.maximum(np.minimum(local_need[granted], cpu_cycle_frequency), minimum_share)
+    remaining = max(cpu_cycle_frequency - F.sum(), 0)
+    if (~granted).any():
+        F[~granted] += remaining * (e * Z * D)[~granted] / (e * Z * D)[~granted].sum()
+
+    # smallest offloaded data that lets the local part finish within the time budget
+    needed = np.clip(D - np.maximum(slack, 0) * F / (e * Z), 0, D)
+    needed[granted & np.isfinite(local_need)] = 0
+    needed[no_offloading] = 0
+
+    # the backhaul each task needs for both time budgets at these B, F and D_o: the model transfer after the
+    # upload and the local part (time_budget1) and the offloaded data after the upload (time_budget2)
+    upload_left = t - D / B
+    transfer_left = upload_left - e * Z * (D - needed) / F
+    transfer_need = np.where(M > 0, M / np.maximum(transfer_left, 1e-12), 0)
+    offload_need = np.where(needed > 0, needed / np.maximum(upload_left, 1e-12), 0)
+    required = np.maximum(minimum_share, np.maximum(transfer_need, offload_need))
+    # backhaul moves to the tasks short of it and what is left goes by demand; when the needs exceed the
+    # budget, the start breaks a time budget and the solver only takes it as a hint
+    if required.sum() <= backhaul_bandwidth_budget:
+        bB = required + proportional_shares(backhaul_bandwidth_budget - required.sum(), (D + M) / t, 0)
+    return B, bB, F, needed
+
+
+def set_start(var, tasks_ids, values):
+    for task_id, value in zip(tasks_ids, values.tolist()):
+        if not var[task_id].fixed:
+            var[task_id].set_value(value, skip_validation=True)
+
+
+def erafl_start_values(constant_params, tasks, levels=None):
+    # {variable: values}; with levels (the conic formulation) alpha is rounded up to the next level. The
+    # allocation of the NumPy heuristic, which fits the budgets, when it finds one, else heuristic_start
+    # (imported here, as heuristic imports decomposition, which imports this module)
+    from heuristic import erafl_heuristic_values
+    allocation = erafl_heuristic_values(constant_params, tasks, OFFLOADING_LEVELS if levels is None else levels)
+    if allocation is None:
+        B, bB, F, needed = heuristic_start(constant_params, tasks, 'ERAFL')
+    else:
+        B, bB, F, needed = (allocation[name] for name in ('B', 'bB', 'F', 'D_o'))
+    D = tasks.column('D')
+    fraction = needed / D
+
+    # no offloading, a partial share within [0.3, 0.7], or everything
+    b1 = (fraction > 0) & (fraction <= 0.7)
+    b2 = fraction > 0.7
+    alpha = np.where(b1, np.clip(fraction, 0.3, 0.7), 0.3)
+    values = dict()
+
+    if levels is not None:
+        levels = np.asarray(levels)
+        values['level'] = np.searchsorted(levels, np.where(b1, alpha, b2.astype(float)) - 1e-9)
+        alpha = np.where(b1, levels[values['level']], 0.3)
+
+    values.update({'B': B, 'bB': bB, 'F': F, 'b': 1 / B, 'bb': 1 / bB, 'f': 1 / F, 'b1': b1.astype(int),
+                   'b2': b2.astype(int), 'alpha': alpha, 'D_o': np.where(b1, alpha, b2) * D})
+    return values
+
+
+def bos_start_values(constant_params, tasks):
+    B, bB, F, needed = heuristic_start(constant_params, tasks, 'BOS')
+
+    # offloading is all or nothing in BOS
+    alpha = (needed > 0).astype(int)
+    return {'B': B, 'bB': bB, 'F': F, 'b': 1 / B, 'bb': 1 / bB, 'f': 1 / F, 'alpha': alpha,
+            'D_o': alpha * tasks.column('D')}
+
+
+def start_erafl(model, constant_params, tasks):
+    conic = hasattr(model, 'z')
+    values = erafl_start_values(constant_params, tasks, [model.x[k] for k in model.k] if conic else None)
+    tasks_ids = tasks.tasks_ids
+
+    if conic:
+        # fill the copies of the chosen level, the others stay at 0
+        level, bB, F = values.pop('level'), values['bB'], values['F']
+        for row, task_id in enumerate(tasks_ids):
+            for k in model.k:
+                chosen = k == level[row]
+                model.z[task_id, k].set_value(int(chosen))
+                model.F_k[task_id, k].set_value(F[row] if chosen else 0)
+                model.f_k[task_id, k].set_value(1 / F[row] if chosen else 0)
+                model.bB_k[task_id, k].set_value(bB[row] if chosen else 0)
+                model.bb_k[task_id, k].set_value(1 / bB[row] if chosen else 0)
+
+    for name, column in values.items():
+        set_start(getattr(model, name), tasks_ids, column)
+
+
+def start_bos(model, constant_params, tasks):
+    tasks_ids = tasks.tasks_ids
+    for name, column in bos_start_values(constant_params, tasks).items():
+        set_start(getattr(model, name), tasks_ids, column)